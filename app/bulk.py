@@ -0,0 +1,187 @@
+"""
+Export en flux et import par lots des propriétés (NDJSON / CSV).
+"""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from app.models.post import GeoPoint, OwnerSnapshot, Property
+from app.models.user import User
+from app.pipelines import PROPERTY_FIELDS
+from app.schemas.post import ImportReport, ImportRowError
+from app.stats import STATUSES
+
+CSV_COLUMNS = [
+    "id", "title", "price", "type", "localisation", "adresse_complet", "description",
+    "surface", "chambres", "salle_de_bain", "equipement", "images", "status",
+    "latitude", "longitude", "created_at",
+]
+LIST_SEPARATOR = "|"
+
+EXPORT_PROJECTION = {field: 1 for field in PROPERTY_FIELDS if field != "image_variants"}
+
+
+def _export_doc(doc: dict) -> dict:
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+async def iter_export_ndjson(collection, query: dict, batch_size: int = 1000) -> AsyncIterator[bytes]:
+    cursor = collection.find(query, projection=EXPORT_PROJECTION, batch_size=batch_size)
+    buffer = []
+    async for doc in cursor:
+        buffer.append(json.dumps(_export_doc(doc), default=str, ensure_ascii=False))
+        if len(buffer) >= batch_size:
+            yield ("\n".join(buffer) + "\n").encode()
+            buffer = []
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode()
+
+
+def _csv_row(doc: dict) -> list:
+    location = doc.get("location") or {}
+    lng, lat = (location.get("coordinates") or [None, None])[:2]
+    row = dict(doc, latitude=lat, longitude=lng)
+    row["equipement"] = LIST_SEPARATOR.join(doc.get("equipement") or [])
+    row["images"] = LIST_SEPARATOR.join(doc.get("images") or [])
+    row["created_at"] = doc["created_at"].isoformat() if doc.get("created_at") else ""
+    return [row.get(column, "") for column in CSV_COLUMNS]
+
+
+async def iter_export_csv(collection, query: dict, batch_size: int = 1000) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+
+    cursor = collection.find(query, projection=EXPORT_PROJECTION, batch_size=batch_size)
+    count = 0
+    async for doc in cursor:
+        writer.writerow(_csv_row(_export_doc(doc)))
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def parse_csv_row(row: dict) -> dict:
+    """Convertit une ligne CSV (colonnes CSV_COLUMNS) en champs de Property."""
+    data = {k: v for k, v in row.items() if k in CSV_COLUMNS and v not in (None, "")}
+    for field in ("equipement", "images"):
+        data[field] = [item for item in data.get(field, "").split(LIST_SEPARATOR) if item]
+    lat, lng = data.pop("latitude", None), data.pop("longitude", None)
+    if (lat is None) != (lng is None):
+        raise ValueError("latitude and longitude must be provided together")
+    if lat is not None:
+        data["location"] = GeoPoint.from_lat_lng(float(lat), float(lng)).model_dump()
+    return data
+
+
+def iter_ndjson_lines(stream: io.TextIOBase) -> Iterable[str]:
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def parse_ndjson_line(line: str) -> dict:
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    return data
+
+
+def read_block(rows: Iterator, size: int) -> Tuple[List[Any], Optional[str], bool]:
+    """
+    Lit jusqu'à `size` lignes : (lignes, erreur de lecture, fin du fichier).
+    Une ligne CSV malformée est sautée ; un octet non UTF-8 arrête la lecture
+    (le décodeur ne peut pas se resynchroniser).
+    """
+    block = []
+    try:
+        for raw in rows:
+            block.append(raw)
+            if len(block) >= size:
+                return block, None, False
+    except UnicodeDecodeError:
+        return block, "file is not valid UTF-8: import stopped", True
+    except csv.Error as e:
+        return block, str(e), False
+    return block, None, True
+
+
+async def import_rows(
+    rows: Iterable,
+    parse: Callable[[Any], dict],
+    owner: Optional[User],
+    batch_size: int = 1000,
+    on_insert: Optional[Callable[[List[Property]], Awaitable[None]]] = None,
+) -> ImportReport:
+    """
+    Valide chaque ligne avec le modèle Property et insère par lots (insert_many).
+    Les lignes invalides sont ignorées et reportées avec leur numéro (1 = première ligne de données).
+    `rows` est un itérateur bloquant (fichier temporaire) : il est lu par blocs dans
+    le pool de threads. `on_insert` est appelé après chaque lot inséré (statistiques, ...).
+    """
+    inserted = 0
+    errors: List[ImportRowError] = []
+    snapshot = OwnerSnapshot.from_user(owner) if owner is not None else None
+    batch: List[Property] = []
+    rows = iter(rows)
+    row_number = 0
+    done = False
+
+    while not done:
+        block, read_error, done = await run_in_threadpool(read_block, rows, batch_size)
+        for raw in block:
+            row_number += 1
+            try:
+                row = parse(raw)
+            except ValueError as e:
+                # Ligne illisible (JSON invalide, coordonnées non numériques, ...)
+                errors.append(ImportRowError(row=row_number, errors=[str(e)]))
+                continue
+
+            # updated_at est posé à l'insertion : une valeur fournie (export ré-importé)
+            # placerait la ligne derrière les curseurs de synchronisation
+            for key in ("id", "_id", "owner", "owner_snapshot", "updated_at"):
+                row.pop(key, None)
+            status = row.setdefault("status", "en cours")
+            if status not in STATUSES:
+                errors.append(ImportRowError(
+                    row=row_number,
+                    errors=[f"status: must be one of {', '.join(STATUSES)}"],
+                ))
+                continue
+            try:
+                batch.append(Property(**row, owner=owner, owner_snapshot=snapshot))
+            except ValidationError as e:
+                errors.append(ImportRowError(
+                    row=row_number,
+                    errors=[f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()],
+                ))
+                continue
+
+            if len(batch) >= batch_size:
+                await Property.insert_many(batch)
+                inserted += len(batch)
+                if on_insert is not None:
+                    await on_insert(batch)
+                batch = []
+
+        if read_error is not None:
+            row_number += 1
+            errors.append(ImportRowError(row=row_number, errors=[read_error]))
+
+    if batch:
+        await Property.insert_many(batch)
+        inserted += len(batch)
+        if on_insert is not None:
+            await on_insert(batch)
+
+    return ImportReport(inserted=inserted, errors=errors)
@@ -0,0 +1,162 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+import orjson
+
+from app.config import settings
+
+
+def cache_key(namespace: str, params: Optional[dict] = None) -> str:
+    """Clé stable : namespace + paramètres de requête triés."""
+    if not params:
+        return f"{namespace}:"
+    items = sorted((k, v) for k, v in params.items() if v is not None)
+    return f"{namespace}:{urlencode(items, doseq=True)}"
+
+
+class CacheBackend:
+    """Interface commune des backends de cache de réponses."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class MemoryCache(CacheBackend):
+    """Cache local au processus, borné en nombre d'entrées, éviction LRU + TTL."""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: int = 30):
+        super().__init__()
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        data = super().stats()
+        data.update({
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        })
+        return data
+
+
+class RedisCache(CacheBackend):
+    """Cache partagé entre workers uvicorn ; les valeurs sont stockées en JSON (dates ISO 8601)."""
+
+    def __init__(self, url: str, default_ttl: int = 30, prefix: str = "immobilier:"):
+        super().__init__()
+        import redis.asyncio as redis
+
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        await self._redis.set(
+            self.prefix + key,
+            orjson.dumps(value, default=str),
+            ex=ttl if ttl is not None else self.default_ttl,
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*[self.prefix + k for k in keys])
+
+    async def delete_prefix(self, prefix: str) -> None:
+        batch = []
+        async for key in self._redis.scan_iter(match=f"{self.prefix}{prefix}*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self._redis.delete(*batch)
+                batch = []
+        if batch:
+            await self._redis.delete(*batch)
+
+    async def clear(self) -> None:
+        await self.delete_prefix("")
+
+
+def build_cache() -> CacheBackend:
+    if settings.cache_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("cache_backend=redis nécessite redis_url")
+        return RedisCache(settings.redis_url, default_ttl=settings.cache_ttl_seconds)
+    return MemoryCache(
+        max_entries=settings.cache_max_entries,
+        default_ttl=settings.cache_ttl_seconds,
+    )
+
+
+response_cache: CacheBackend = build_cache()
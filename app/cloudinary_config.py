@@ -1,9 +0,0 @@
-import cloudinary
-
-cloudinary.config(
-    cloud_name="dlnlrwksu",        # Ton cloud_name depuis CLOUDINARY_URL
-    api_key="811394648148274",     # Ton API Key
-    api_secret="QL44lCxYAr14AG6k8WSMZiKpZJg",  # Remplace par ton API Secret
-    secure=True
-)
-
@@ -0,0 +1,163 @@
+"""
+Requêtes conditionnelles (ETag / Last-Modified / 304).
+
+Chaque collection a un compteur de version incrémenté à chaque écriture ; les
+ETags sont calculés à partir de ces compteurs (et de la révision du document
+pour les détails), ce qui permet de répondre 304 avant de lire ou sérialiser
+le corps de la réponse. Les versions lues sont gardées en mémoire
+`version_cache_ttl_seconds` : un hit du cache de réponses ne coûte pas
+d'aller-retour MongoDB.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+from app import mongo_connect
+from app.cache import response_cache
+from app.config import settings
+
+VERSIONS_COLLECTION = "collection_versions"
+
+Version = Tuple[int, Optional[datetime]]
+
+# Réponses authentifiées : jamais partagées, toujours revalidées
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+# (collection, lecture publique) -> (expiration monotonic, version)
+_local_versions: Dict[Tuple[str, bool], Tuple[float, Version]] = {}
+
+
+def public_cache_control() -> str:
+    return f"public, max-age={settings.public_cache_max_age}, must-revalidate"
+
+
+async def bump_version(name: str) -> None:
+    await mongo_connect.db[VERSIONS_COLLECTION].update_one(
+        {"_id": name},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    # Les autres workers voient la nouvelle version après au plus version_cache_ttl_seconds
+    _local_versions.pop((name, False), None)
+    _local_versions.pop((name, True), None)
+
+
+async def get_versions(*names: str, public: bool = False) -> Dict[str, Version]:
+    """
+    Versions des collections, au plus une requête (les versions encore en
+    mémoire ne sont pas relues). `public=True` lit sur le même handle que les
+    endpoints anonymes pour rester cohérent avec leur corps.
+    """
+    now = time.monotonic()
+    missing = [
+        name for name in names
+        if _local_versions.get((name, public), (0.0, None))[0] <= now
+    ]
+    if missing:
+        if public:
+            collection = mongo_connect.get_public_collection(VERSIONS_COLLECTION)
+        else:
+            collection = mongo_connect.db[VERSIONS_COLLECTION]
+        docs = await collection.find({"_id": {"$in": missing}}).to_list(None)
+        found = {doc["_id"]: (doc["version"], doc.get("updated_at")) for doc in docs}
+        expires_at = now + settings.version_cache_ttl_seconds
+        for name in missing:
+            _local_versions[(name, public)] = (expires_at, found.get(name, (0, None)))
+    return {name: _local_versions[(name, public)][1] for name in names}
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def latest(*dates: Optional[datetime]) -> Optional[datetime]:
+    dates = [d for d in dates if d is not None]
+    return max(dates) if dates else None
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime], cache_control: str) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-None-Match est prioritaire ; If-Modified-Since n'est utilisé qu'en son absence."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # Précision HTTP : la seconde
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def evaluate(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime],
+    cache_control: str,
+) -> Tuple[Optional[Response], Dict[str, str]]:
+    """Renvoie (réponse 304 ou None, en-têtes de validation à joindre à la réponse 200)."""
+    headers = validator_headers(etag, last_modified, cache_control)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers), headers
+    return None, headers
+
+
+async def evaluate_collections(
+    request: Request,
+    scope: str,
+    names: Tuple[str, ...],
+    cache_control: str,
+    public: bool = False,
+) -> Tuple[Optional[Response], Dict[str, str]]:
+    """
+    Validateurs d'une réponse qui ne dépend que du contenu de `names` :
+    l'ETag combine `scope` (route + paramètres) et les versions des collections.
+    """
+    versions = await get_versions(*names, public=public)
+    etag = make_etag(scope, *(versions[name][0] for name in names))
+    last_modified = latest(*(updated_at for _, updated_at in versions.values()))
+    return evaluate(request, etag, last_modified, cache_control)
+
+
+async def get_cached_body(key: str, etag: str) -> Optional[Any]:
+    """
+    Corps en cache pour `key`, seulement s'il a été produit sous `etag` : une
+    entrée écrite avant une écriture (requête en vol, autre worker) n'est
+    jamais servie avec l'ETag de la nouvelle version.
+    """
+    entry = await response_cache.get(key)
+    if entry is None or entry.get("etag") != etag:
+        return None
+    return entry["body"]
+
+
+async def set_cached_body(key: str, etag: str, body: Any, ttl: Optional[int] = None) -> None:
+    await response_cache.set(key, {"etag": etag, "body": body}, ttl=ttl)
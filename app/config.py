@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -10,6 +12,80 @@ class Settings(BaseSettings):
     cors_origin:str="*"
     chunk_size: int = 1024 * 1024
     sendinblue_api_key: str  
+
+    # Cache des réponses publiques ("memory" ou "redis")
+    cache_backend: str = "memory"
+    cache_max_entries: int = 1024
+    cache_ttl_seconds: int = 30
+    redis_url: Optional[str] = None
+
+    # Uploads d'images (pool de threads et plafond d'uploads simultanés par processus)
+    upload_max_workers: int = 8
+    upload_max_concurrency: int = 8
+    image_process_workers: int = 2
+
+    # Stockage des médias ("cloudinary", "gridfs" ou "local")
+    storage_backend: str = "cloudinary"
+    local_storage_dir: str = "uploads/images"
+    media_cache_max_age: int = 31536000
+    # Déduplication des images par empreinte SHA-256 ; délai avant suppression des médias orphelins
+    media_dedup: bool = True
+    media_gc_grace_hours: int = 24
+
+    # Cache des utilisateurs authentifiés et des jetons vérifiés
+    user_cache_max_entries: int = 10000
+    user_cache_ttl_seconds: int = 60
+    token_cache_ttl_seconds: int = 300
+
+    # Hachage bcrypt (coût, pool dédié et profondeur de file max)
+    bcrypt_rounds: int = 12
+    hash_max_workers: int = 2
+    hash_max_queue: int = 32
+
+    # Facettes de recherche (bornes des tranches de prix en FCFA)
+    facets_cache_ttl_seconds: int = 60
+    facets_max_localisations: int = 50
+    facet_price_boundaries: List[float] = [
+        0, 100_000, 500_000, 1_000_000, 10_000_000, 50_000_000, 100_000_000, 250_000_000,
+    ]
+
+    # Export / import en masse
+    export_batch_size: int = 1000
+    import_batch_size: int = 1000
+
+    # File d'emails ("brevo" ou "stub") et client HTTP partagé
+    email_transport: str = "brevo"
+    email_workers: int = 4
+    email_queue_max_size: int = 1000
+    email_max_attempts: int = 5
+    email_retry_base_delay: float = 1.0
+    http_timeout_seconds: float = 10.0
+    http_max_connections: int = 20
+
+    # Client Mongo : pool, délais, compression réseau et routage des lectures publiques
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_connect_timeout_ms: int = 10000
+    mongo_server_selection_timeout_ms: int = 10000
+    mongo_socket_timeout_ms: Optional[int] = None
+    mongo_compressors: Optional[str] = None  # ex. "zstd,snappy,zlib"
+    mongo_public_read_preference: str = "secondaryPreferred"
+    mongo_max_staleness_seconds: int = 90  # minimum accepté par le driver : 90
+
+    # Synchronisation incrémentale : au-delà, les clients doivent tout recharger
+    tombstone_retention_days: int = 30
+    # Fenêtre relue à chaque synchronisation (écritures validées dans le désordre, horloges des workers)
+    sync_overlap_seconds: int = 5
+
+    # Requêtes conditionnelles : durée de fraîcheur des réponses publiques (ETag revalidé ensuite)
+    public_cache_max_age: int = 30
+    # Durée pendant laquelle un worker réutilise les versions de collections lues
+    version_cache_ttl_seconds: float = 1.0
+
+    # Démarrage à froid rapide : pas de création/vérification des index au boot
+    # (python -m scripts.create_indexes au déploiement), pas de bannière rich
+    lazy_startup: bool = False
   
 
     @property
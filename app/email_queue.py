@@ -0,0 +1,161 @@
+"""
+File d'envoi d'emails en arrière-plan (processus courant).
+
+Les handlers n'attendent que la mise en file ; des workers asyncio envoient les
+messages via un transport interchangeable, avec retries exponentiels et une
+liste de lettres mortes pour les échecs définitifs.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from collections import deque
+from typing import List, Optional
+
+import httpx
+
+from app.config import settings
+from app.metrics import time_external
+
+logger = logging.getLogger(__name__)
+
+BREVO_URL = "https://api.brevo.com/v3/smtp/email"
+
+
+class PermanentEmailError(Exception):
+    """Erreur non récupérable : le message part directement en lettres mortes."""
+
+
+class EmailTransport:
+    async def send(self, payload: dict) -> dict:
+        raise NotImplementedError
+
+
+class BrevoTransport(EmailTransport):
+    def __init__(self, client: httpx.AsyncClient, api_key: str, url: str = BREVO_URL):
+        self.client = client
+        self.api_key = api_key
+        self.url = url
+
+    async def send(self, payload: dict) -> dict:
+        with time_external("brevo", "send_email"):
+            resp = await self.client.post(
+                self.url,
+                json=payload,
+                headers={"api-key": self.api_key, "Content-Type": "application/json"},
+            )
+            if 400 <= resp.status_code < 500 and resp.status_code != 429:
+                raise PermanentEmailError(f"Brevo {resp.status_code}: {resp.text}")
+            resp.raise_for_status()
+        return resp.json()
+
+
+class StubTransport(EmailTransport):
+    """Transport local : conserve les messages au lieu de les envoyer."""
+
+    def __init__(self):
+        self.sent: List[dict] = []
+
+    async def send(self, payload: dict) -> dict:
+        self.sent.append(payload)
+        return {"messageId": f"stub-{len(self.sent)}"}
+
+
+class EmailQueue:
+    def __init__(
+        self,
+        workers: int = 4,
+        max_size: int = 1000,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        dead_letter_size: int = 1000,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.transport: Optional[EmailTransport] = None
+        self.dead_letters: deque = deque(maxlen=dead_letter_size)
+        self.sent = 0
+        self.retries = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, transport: EmailTransport) -> None:
+        self.transport = transport
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Laisse `timeout` secondes aux envois en cours puis arrête les workers."""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Arrêt de la file d'emails avec %d message(s) non envoyé(s)", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, payload: dict) -> str:
+        """Met un message en file ; lève asyncio.QueueFull si la file est pleine."""
+        job_id = str(uuid.uuid4())
+        self._queue.put_nowait({"id": job_id, "payload": payload, "attempts": 0})
+        return job_id
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: dict) -> None:
+        while True:
+            job["attempts"] += 1
+            try:
+                await self.transport.send(job["payload"])
+                self.sent += 1
+                return
+            except PermanentEmailError as e:
+                error = e
+            except Exception as e:
+                error = e
+                if job["attempts"] < self.max_attempts:
+                    self.retries += 1
+                    # Backoff exponentiel avec jitter
+                    delay = self.base_delay * 2 ** (job["attempts"] - 1)
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                    continue
+            logger.error("Email %s abandonné après %d tentative(s) : %s", job["id"], job["attempts"], error)
+            # Ni corps ni pièces : le message peut contenir des identifiants en clair
+            payload = job["payload"]
+            self.dead_letters.append({
+                "id": job["id"],
+                "attempts": job["attempts"],
+                "to": [recipient.get("email") for recipient in payload.get("to", [])],
+                "subject": payload.get("subject"),
+                "error": str(error),
+            })
+            return
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "retries": self.retries,
+            "dead_letters": len(self.dead_letters),
+        }
+
+
+def build_transport(client: httpx.AsyncClient) -> EmailTransport:
+    if settings.email_transport == "stub":
+        return StubTransport()
+    return BrevoTransport(client, settings.sendinblue_api_key)
+
+
+email_queue = EmailQueue(
+    workers=settings.email_workers,
+    max_size=settings.email_queue_max_size,
+    max_attempts=settings.email_max_attempts,
+    base_delay=settings.email_retry_base_delay,
+)
@@ -0,0 +1,96 @@
+import asyncio
+import csv
+import re
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+LatLng = Tuple[float, float]
+
+
+def normalize_address(address: str) -> str:
+    """Minuscules, sans accents ni ponctuation : clé de cache et de gazetteer."""
+    text = unicodedata.normalize("NFKD", address).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+class Geocoder:
+    """Interface des géocodeurs : renvoie (latitude, longitude) ou None."""
+
+    async def geocode(self, address: str) -> Optional[LatLng]:
+        raise NotImplementedError
+
+
+class GazetteerGeocoder(Geocoder):
+    """
+    Géocodeur hors ligne à partir d'un CSV `name,latitude,longitude`.
+    Correspondance exacte, sinon le nom de lieu le plus long contenu dans l'adresse.
+    """
+
+    def __init__(self, path: str):
+        self.places: Dict[str, LatLng] = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.places[normalize_address(row["name"])] = (float(row["latitude"]), float(row["longitude"]))
+        self._by_length = sorted(self.places, key=len, reverse=True)
+
+    async def geocode(self, address: str) -> Optional[LatLng]:
+        key = normalize_address(address)
+        if key in self.places:
+            return self.places[key]
+        padded = f" {key} "
+        for name in self._by_length:
+            if f" {name} " in padded:
+                return self.places[name]
+        return None
+
+
+class NominatimGeocoder(Geocoder):
+    """Géocodeur OpenStreetMap via geopy, limité à une requête par seconde."""
+
+    def __init__(self, user_agent: str = "immobilier-api", country_codes: str = "sn"):
+        from geopy.extra.rate_limiter import RateLimiter
+        from geopy.geocoders import Nominatim
+
+        self.country_codes = country_codes
+        self._geocode = RateLimiter(Nominatim(user_agent=user_agent).geocode, min_delay_seconds=1)
+
+    async def geocode(self, address: str) -> Optional[LatLng]:
+        location = await asyncio.to_thread(self._geocode, address, country_codes=self.country_codes)
+        if location is None:
+            return None
+        return location.latitude, location.longitude
+
+
+class CachedGeocoder(Geocoder):
+    """
+    Mémorise chaque adresse normalisée dans une collection Mongo (résultats négatifs
+    compris) afin qu'elle ne soit géocodée qu'une seule fois.
+    """
+
+    def __init__(self, geocoder: Geocoder, collection):
+        self.geocoder = geocoder
+        self.collection = collection
+        self.hits = 0
+        self.misses = 0
+
+    async def geocode(self, address: str) -> Optional[LatLng]:
+        key = normalize_address(address)
+        if not key:
+            return None
+        cached = await self.collection.find_one({"_id": key})
+        if cached is not None:
+            self.hits += 1
+            return (cached["latitude"], cached["longitude"]) if cached["found"] else None
+
+        self.misses += 1
+        result = await self.geocoder.geocode(address)
+        await self.collection.replace_one(
+            {"_id": key},
+            {
+                "found": result is not None,
+                "latitude": result[0] if result else None,
+                "longitude": result[1] if result else None,
+            },
+            upsert=True,
+        )
+        return result
@@ -0,0 +1,52 @@
+"""
+Traitement des images à l'upload (exécuté dans un pool de processus).
+
+Les fonctions de ce module ne dépendent que de Pillow pour rester importables
+et sérialisables (pickle) depuis les processus du pool.
+"""
+from io import BytesIO
+from typing import Dict
+
+from PIL import Image, ImageOps
+
+# Fichiers refusés (400) : illisibles (inclut UnidentifiedImageError) ou bombes de décompression
+INVALID_IMAGE_ERRORS = (OSError, Image.DecompressionBombError)
+
+VARIANT_WIDTHS = (480, 960, 1600)
+THUMBNAIL_SIZE = (320, 320)
+WEBP_QUALITY = 82
+THUMBNAIL_QUALITY = 70
+
+
+def _to_webp(image: Image.Image, quality: int) -> bytes:
+    buffer = BytesIO()
+    # Aucune donnée EXIF n'est transmise à l'encodeur : elles sont supprimées
+    image.save(buffer, format="WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def process_image(data: bytes) -> Dict[str, bytes]:
+    """
+    Oriente l'image selon son EXIF, supprime les métadonnées et produit :
+    - "original" : l'image pleine taille en WebP
+    - "thumbnail" : une vignette tenant dans THUMBNAIL_SIZE
+    - une entrée par largeur de VARIANT_WIDTHS inférieure à la largeur source
+    """
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        outputs = {"original": _to_webp(image, WEBP_QUALITY)}
+        for width in VARIANT_WIDTHS:
+            if width >= image.width:
+                continue
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            outputs[str(width)] = _to_webp(resized, WEBP_QUALITY)
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        outputs["thumbnail"] = _to_webp(thumbnail, THUMBNAIL_QUALITY)
+
+    return outputs
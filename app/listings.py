@@ -0,0 +1,50 @@
+"""
+Écritures transverses sur les annonces, partagées par les routeurs.
+
+Invalidation des caches publics (et version de collection des ETags) et
+répercussion de l'instantané du propriétaire : seul `refresh_owner_snapshots`
+écrit `owner_snapshot` après la création d'une annonce.
+"""
+from datetime import datetime
+from typing import Optional
+
+from app import mongo_connect
+from app.cache import cache_key, response_cache
+from app.conditional import bump_version
+from app.models.post import OwnerSnapshot, Property
+from app.models.user import User
+
+
+async def invalidate_public_cache(property_id: Optional[str] = None, facets: bool = True) -> None:
+    """
+    Invalide les pages de listing publiques et, si fourni, le détail de la propriété.
+    Les facettes ne sont invalidées que si un champ compté (statut, prix, ...) a changé.
+    Incrémente ensuite la version de la collection utilisée par les ETags : le
+    cache est vidé avant, une entrée ne survit pas sous la nouvelle version.
+    """
+    if property_id is not None:
+        await response_cache.delete(cache_key(f"public:detail:{property_id}"))
+    if facets:
+        await response_cache.delete_prefix("public:facets:")
+    await response_cache.delete_prefix("public:all:")
+    await response_cache.delete_prefix("public:search:")
+    await response_cache.delete_prefix("public:geo:")
+    await bump_version(Property.Settings.name)
+
+
+async def refresh_owner_snapshots(user: User) -> None:
+    """
+    Répercute nom / email / agence / contact de `user` sur toutes ses annonces
+    en une update_many (index owner_created_at). updated_at est avancé pour que
+    ETags et synchronisation incrémentale voient le changement.
+    """
+    result = await mongo_connect.db[Property.Settings.name].update_many(
+        {"owner.$id": user.id},
+        {"$set": {
+            "owner_snapshot": OwnerSnapshot.from_user(user).model_dump(),
+            "updated_at": datetime.utcnow(),
+        }},
+    )
+    if result.modified_count:
+        await response_cache.delete_prefix("public:detail:")
+        await invalidate_public_cache(facets=False)
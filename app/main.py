@@ -1,43 +1,61 @@
 from contextlib import asynccontextmanager
+import logging
 import os
 from dotenv import load_dotenv
-import cloudinary
+import httpx
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from rich.console import Console
 
-from app.routers import user, auth, post
+from app.routers import user, auth, post, media
+from app.cache import response_cache
+from app.config import settings
+from app.email_queue import build_transport, email_queue
+from app import metrics
+from app.oauth2 import token_cache, user_cache
 from app.mongo_connect import connect_database, disconnect_from_database
+from app.mongo_monitoring import pool_monitor
 
-console = Console()
+logger = logging.getLogger(__name__)
 
-# Charger les variables d'environnement
+# Charger les variables d'environnement (Cloudinary est configuré au premier upload)
 load_dotenv()
 
-# Configurer Cloudinary
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
-
 # Créer le dossier uploads/images s'il n'existe pas (au cas où tu veux garder local aussi)
 UPLOAD_DIR = "uploads/images"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
+def announce(message: str, rich_markup: str) -> None:
+    # rich coûte à l'import : en mode lazy_startup, simple log
+    if settings.lazy_startup:
+        logger.info(message)
+        return
+    from rich.console import Console
+    Console().print(rich_markup)
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
-    console.print(":banana: [cyan underline]Immobilier APIs is starting ...[/]")
+    announce("Immobilier APIs is starting ...", ":banana: [cyan underline]Immobilier APIs is starting ...[/]")
     await connect_database()
+    # Client HTTP partagé (pool de connexions TLS) pour les appels sortants
+    http_client = httpx.AsyncClient(
+        timeout=settings.http_timeout_seconds,
+        limits=httpx.Limits(max_connections=settings.http_max_connections),
+    )
+    await email_queue.start(build_transport(http_client))
     yield
-    console.print(":mango: [bold red underline]Immobilier APIs shutting down ...[/]")
+    announce("Immobilier APIs shutting down ...", ":mango: [bold red underline]Immobilier APIs shutting down ...[/]")
+    await email_queue.stop()
+    post.shutdown_image_pool()
+    await http_client.aclose()
     await disconnect_from_database()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS
 origins = ["*"]
@@ -48,6 +66,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Monter le dossier uploads comme fichiers statiques
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -56,6 +75,7 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 app.include_router(auth.router)
 app.include_router(user.router)
 app.include_router(post.router)
+app.include_router(media.router)
 
 
 # Route de test pour vérifier que l'API fonctionne
@@ -82,3 +102,35 @@ async def health_check():
             "writable": uploads_writable
         }
     }
+
+
+# Statistiques des caches (réglage des TTL) ; users.hits = lectures Mongo évitées
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "responses": response_cache.stats(),
+        "users": user_cache.stats(),
+        "tokens": token_cache.stats(),
+    }
+
+
+# Utilisation du pool de connexions Mongo de ce worker
+@app.get("/db/pool")
+async def db_pool_stats():
+    return pool_monitor.stats()
+
+
+# Métriques Prometheus de ce worker (latences par route, Mongo, services externes)
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    pool = pool_monitor.stats()
+    for server, values in pool["servers"].items():
+        metrics.mongo_pool_connections.set(values["open"], server=server, state="open")
+        metrics.mongo_pool_connections.set(values["in_use"], server=server, state="in_use")
+    for state, value in email_queue.stats().items():
+        metrics.email_queue_state.set(value, state=state)
+    for name, cache in (("responses", response_cache), ("users", user_cache), ("tokens", token_cache)):
+        for event, value in cache.stats().items():
+            if isinstance(value, (int, float)):
+                metrics.cache_events.set(value, cache=name, event=event)
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,97 @@
+"""
+Index des médias adressés par contenu (collection media_assets).
+
+L'empreinte SHA-256 des octets envoyés est calculée pendant la lecture de
+l'upload ; si elle est connue, l'URL déjà stockée est réutilisée sans
+traitement ni upload. Une annonce importée qui pointe vers des URLs connues en
+prend aussi une référence. Les références sont décomptées à la suppression d'une
+annonce ; scripts.gc_media supprime par lots les médias restés orphelins.
+"""
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import UploadFile
+from pymongo import ReturnDocument, UpdateOne
+
+from app import mongo_connect
+from app.models.post import ImageVariants, MediaAsset
+
+StoredImage = Tuple[str, Optional[ImageVariants]]
+
+
+def _collection():
+    return mongo_connect.db[MediaAsset.Settings.name]
+
+
+async def read_and_hash(upload_file: UploadFile, chunk_size: int) -> Tuple[bytes, str]:
+    """Lit l'upload par morceaux en calculant son SHA-256 au passage."""
+    digest = hashlib.sha256()
+    chunks = []
+    while chunk := await upload_file.read(chunk_size):
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
+
+
+def _stored(doc: dict) -> StoredImage:
+    variants = doc.get("variants")
+    return doc["url"], ImageVariants(**variants) if variants else None
+
+
+async def acquire(digest: str) -> Optional[StoredImage]:
+    """Média déjà stocké : prend une référence et renvoie (url, variantes)."""
+    doc = await _collection().find_one_and_update(
+        {"_id": digest},
+        {"$inc": {"refcount": 1}, "$set": {"orphaned_at": None}},
+        return_document=ReturnDocument.AFTER,
+    )
+    return _stored(doc) if doc else None
+
+
+async def register(digest: str, url: str, variants: ImageVariants) -> StoredImage:
+    """
+    Enregistre un média nouvellement stocké avec une référence. Si un upload
+    concurrent du même contenu a gagné, son URL est renvoyée : l'appelant
+    supprime alors sa propre copie du stockage.
+    """
+    doc = await _collection().find_one_and_update(
+        {"_id": digest},
+        {
+            "$setOnInsert": {"url": url, "variants": variants.model_dump(), "created_at": datetime.utcnow()},
+            "$inc": {"refcount": 1},
+            "$set": {"orphaned_at": None},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return _stored(doc)
+
+
+async def retain(urls: Iterable[str]) -> None:
+    """
+    Prend une référence par occurrence d'URL déjà indexée (import d'annonces
+    existantes) ; les URLs inconnues de l'index sont ignorées, comme à la libération.
+    """
+    counts = Counter(urls)
+    if not counts:
+        return
+    await _collection().bulk_write([
+        UpdateOne({"url": url}, {"$inc": {"refcount": count}, "$set": {"orphaned_at": None}})
+        for url, count in counts.items()
+    ], ordered=False)
+
+
+async def release(urls: Iterable[str]) -> None:
+    """Rend une référence par occurrence d'URL ; orphaned_at est posé quand le compteur atteint zéro."""
+    counts = Counter(urls)
+    if not counts:
+        return
+    await _collection().bulk_write([
+        UpdateOne({"url": url}, [
+            {"$set": {"refcount": {"$max": [{"$subtract": ["$refcount", count]}, 0]}}},
+            {"$set": {"orphaned_at": {"$cond": [{"$eq": ["$refcount", 0]}, "$$NOW", None]}}},
+        ])
+        for url, count in counts.items()
+    ], ordered=False)
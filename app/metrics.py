@@ -0,0 +1,225 @@
+"""
+Métriques au format texte Prometheus (par processus), sans dépendance externe.
+
+Compteurs, jauges et histogrammes étiquetés ; `registry.render()` produit le
+contenu servi par /metrics.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        # Les listeners pymongo s'exécutent hors de la boucle d'événements
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}", *self.samples()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Par jeu d'étiquettes : [comptes par bucket (non cumulés) ..., +Inf], somme
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels((*self.labelnames, "le"), (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# HTTP (route = modèle de chemin, ex. /posts/public/{property_id})
+http_requests = registry.register(Counter(
+    "http_requests_total", "Requêtes HTTP traitées.", ("method", "route", "status"),
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP.", ("method", "route"),
+))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes", "Taille du corps des réponses HTTP.", ("method", "route"), buckets=SIZE_BUCKETS,
+))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requêtes HTTP en cours.",
+))
+
+# MongoDB (alimentées par mongo_monitoring.CommandMonitor)
+mongo_command_duration = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "Durée des commandes MongoDB.", ("collection", "command"),
+))
+mongo_command_failures = registry.register(Counter(
+    "mongodb_command_failures_total", "Commandes MongoDB en échec.", ("collection", "command"),
+))
+mongo_documents_returned = registry.register(Counter(
+    "mongodb_documents_returned_total", "Documents renvoyés par les curseurs MongoDB.", ("collection", "command"),
+))
+mongo_pool_connections = registry.register(Gauge(
+    "mongodb_pool_connections", "Connexions du pool MongoDB.", ("server", "state"),
+))
+
+# Services externes (Cloudinary, Brevo)
+external_call_duration = registry.register(Histogram(
+    "external_call_duration_seconds", "Durée des appels aux services externes.", ("service", "operation", "outcome"),
+))
+
+# Files et caches internes, relevés à chaque collecte
+email_queue_state = registry.register(Gauge(
+    "email_queue_messages", "État de la file d'emails.", ("state",),
+))
+cache_events = registry.register(Gauge(
+    "cache_events", "Compteurs des caches en mémoire.", ("cache", "event"),
+))
+
+
+@contextmanager
+def time_external(service: str, operation: str):
+    """Chronomètre un appel externe ; outcome = ok | error."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        external_call_duration.observe(
+            time.perf_counter() - start, service=service, operation=operation, outcome=outcome,
+        )
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : durée, taille de réponse et requêtes en cours par route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            # Route résolue par le routeur FastAPI ; modèle de chemin pour borner la cardinalité
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method=method, route=path, status=status_code)
+            http_request_duration.observe(elapsed, method=method, route=path)
+            http_response_size.observe(size, method=method, route=path)
@@ -1,11 +1,38 @@
-from beanie import Document, Link
-from typing import List, Optional
+from beanie import Document, Link, PydanticObjectId
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 from bson import ObjectId
-from pydantic import Field
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
 
+from app.config import settings
 from app.models.user import User 
 
+class ImageVariants(BaseModel):
+    image: Optional[str] = None  # URL de l'image d'origine à laquelle ces variantes appartiennent
+    thumbnail: str
+    widths: Dict[str, str] = Field(default_factory=dict)  # largeur -> URL WebP
+
+class GeoPoint(BaseModel):
+    """Point GeoJSON ; attention à l'ordre [longitude, latitude]."""
+    type: Literal["Point"] = "Point"
+    coordinates: List[float]
+
+    @classmethod
+    def from_lat_lng(cls, latitude: float, longitude: float) -> "GeoPoint":
+        return cls(coordinates=[longitude, latitude])
+
+class OwnerSnapshot(BaseModel):
+    """Copie des champs publics du propriétaire, rafraîchie à chaque modification de l'utilisateur."""
+    name: str
+    email: str
+    agence: str
+    contact: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "OwnerSnapshot":
+        return cls(name=user.name, email=user.email, agence=user.agence, contact=user.contact)
+
 class Property(Document):
     title: str
     price: float
@@ -18,12 +45,82 @@ class Property(Document):
     salle_de_bain: int
     equipement: List[str]
     images: List[str]
+    # Rattachées à leur image par `image` : les images antérieures au traitement n'en ont pas
+    image_variants: List[ImageVariants] = Field(default_factory=list)
+    location: Optional[GeoPoint] = None
     owner: Optional[Link[User]] = None  # ← Changé ici : ajout de Optional et = None
+    owner_snapshot: Optional[OwnerSnapshot] = None  # lu par les endpoints publics, sans jointure
     status: str = Field(default="en cours")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # à mettre à jour à chaque écriture
 
     class Settings:
         name = "properties"
+        # Index composés pour la pagination par curseur (status, clé de tri, _id)
+        indexes = [
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                       name="status_created_at"),
+            IndexModel([("status", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)],
+                       name="status_price"),
+            IndexModel([("status", ASCENDING), ("surface", ASCENDING), ("_id", ASCENDING)],
+                       name="status_surface"),
+            IndexModel([("status", ASCENDING), ("chambres", ASCENDING), ("_id", ASCENDING)],
+                       name="status_chambres"),
+            IndexModel([("status", ASCENDING), ("salle_de_bain", ASCENDING), ("_id", ASCENDING)],
+                       name="status_salle_de_bain"),
+            IndexModel([("status", ASCENDING), ("type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                       name="status_type_created_at"),
+            IndexModel([("status", ASCENDING), ("localisation", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                       name="status_localisation_created_at"),
+            IndexModel([("owner.$id", ASCENDING), ("created_at", DESCENDING)],
+                       name="owner_created_at"),
+            # Recherche plein texte (racinisation et accents en français)
+            IndexModel([("title", TEXT), ("description", TEXT),
+                        ("localisation", TEXT), ("adresse_complet", TEXT)],
+                       name="text_fr",
+                       default_language="french",
+                       weights={"title": 10, "localisation": 5, "adresse_complet": 3, "description": 1}),
+            IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+            # Synchronisation incrémentale (/posts/changes)
+            IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at"),
+        ]
 
     class Config:
-        json_encoders = {ObjectId: str}
\ No newline at end of file
+        json_encoders = {ObjectId: str}
+
+
+class PropertyTombstone(Document):
+    """Trace d'une propriété supprimée, pour la synchronisation incrémentale."""
+    property_id: PydanticObjectId
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "property_tombstones"
+        indexes = [
+            IndexModel([("deleted_at", ASCENDING), ("_id", ASCENDING)], name="deleted_at"),
+            # Purge automatique après la durée de rétention
+            IndexModel([("deleted_at", ASCENDING)], name="deleted_at_ttl",
+                       expireAfterSeconds=settings.tombstone_retention_days * 86400),
+        ]
+
+
+class MediaAsset(Document):
+    """
+    Image stockée, adressée par le SHA-256 de ses octets source (_id) ; `refcount`
+    compte les références des annonces, orphaned_at est posé quand il tombe à zéro.
+    """
+    id: str
+    url: str
+    variants: Optional[ImageVariants] = None
+    refcount: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    orphaned_at: Optional[datetime] = None
+
+    class Settings:
+        name = "media_assets"
+        indexes = [
+            # Décrément à la suppression d'une annonce (par URL)
+            IndexModel([("url", ASCENDING)], name="url"),
+            # Lots du ramasse-miettes (orphelins les plus anciens d'abord)
+            IndexModel([("orphaned_at", ASCENDING)], name="orphaned_at"),
+        ]
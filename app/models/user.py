@@ -1,4 +1,5 @@
 from beanie import Document
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import EmailStr
 from datetime import datetime
 from bson import ObjectId
@@ -14,6 +15,14 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [
+            # Annuaire paginé (/users/all), filtré ou non par agence
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at"),
+            IndexModel(
+                [("agence", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="agence_created_at",
+            ),
+        ]
 
     class Config:
         json_encoders = {ObjectId: str}
@@ -1,22 +1,58 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
 from beanie import init_beanie
-from app.models.post import Property
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from app.models.post import MediaAsset, Property, PropertyTombstone
 from app.models.user import User
 from app.config import settings
+from app.mongo_monitoring import command_monitor, pool_monitor
 
 client: AsyncIOMotorClient = None
 db = None
+public_db = None
 grid_fs_bucket: AsyncIOMotorGridFSBucket = None
 
-async def connect_database():
-    global client, db, grid_fs_bucket
-    client = AsyncIOMotorClient(settings.mongo_database_url)
+def client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "event_listeners": [pool_monitor, command_monitor],
+    }
+    if settings.mongo_max_idle_time_ms is not None:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_socket_timeout_ms is not None:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+def public_read_preference():
+    """Lectures anonymes : secondaires autorisées, avec une obsolescence bornée."""
+    mode = read_pref_mode_from_name(settings.mongo_public_read_preference)
+    if mode == 0:  # primary n'accepte pas maxStalenessSeconds
+        return make_read_preference(mode, None)
+    return make_read_preference(mode, None, max_staleness=settings.mongo_max_staleness_seconds)
+
+async def connect_database(skip_indexes: bool = None, allow_index_dropping: bool = False):
+    """
+    Par défaut, les index ne sont pas créés en mode `lazy_startup` ;
+    scripts.create_indexes force leur création.
+    """
+    global client, db, public_db, grid_fs_bucket
+    if skip_indexes is None:
+        skip_indexes = settings.lazy_startup
+    client = AsyncIOMotorClient(settings.mongo_database_url, **client_options())
+    # Écritures et lectures authentifiées : primaire (préférence par défaut)
     db = client.get_default_database()
+    public_db = client.get_default_database(read_preference=public_read_preference())
     grid_fs_bucket = AsyncIOMotorGridFSBucket(db)
 
     await init_beanie(
         database=db,
-        document_models=[User,Property]
+        document_models=[User,Property,PropertyTombstone,MediaAsset],
+        skip_indexes=skip_indexes,
+        allow_index_dropping=allow_index_dropping,
     )
 
 async def disconnect_from_database():
@@ -24,14 +60,29 @@ async def disconnect_from_database():
     if client:
         client.close()
 
-async def iter_chunks(file_id, chunk_size: int = 1024):
-    stream = await grid_fs_bucket.open_download_stream(file_id)
-    while True:
-        chunk = await stream.read(chunk_size)
+async def iter_stream_chunks(stream, chunk_size: int = 1024, start: int = 0, length: int = None):
+    """Lit un flux GridFS par morceaux, éventuellement limité à [start, start + length)."""
+    if start:
+        stream.seek(start)
+    remaining = stream.length - start if length is None else length
+    while remaining > 0:
+        chunk = await stream.read(min(chunk_size, remaining))
         if not chunk:
             break
+        remaining -= len(chunk)
         yield chunk
 
+async def iter_chunks(file_id, chunk_size: int = 1024):
+    stream = await grid_fs_bucket.open_download_stream(file_id)
+    async for chunk in iter_stream_chunks(stream, chunk_size):
+        yield chunk
+
+def get_public_collection(name: str):
+    """Collection brute pour les endpoints publics (lecture sur secondaires)."""
+    if public_db is None:
+        raise RuntimeError("Base de données non initialisée. Vérifiez la connexion à la base de données.")
+    return public_db[name]
+
 def get_gridfs_bucket() -> AsyncIOMotorGridFSBucket:
     """Retourne l'instance du GridFS bucket."""
     global grid_fs_bucket
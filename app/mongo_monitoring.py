@@ -0,0 +1,126 @@
+import os
+from collections import defaultdict
+
+from pymongo import monitoring
+
+from app import metrics
+from app.config import settings
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Suivi de l'utilisation des pools de connexions (par serveur, pour ce processus)."""
+
+    def __init__(self):
+        self.open = defaultdict(int)
+        self.checked_out = defaultdict(int)
+        self.peak_checked_out = defaultdict(int)
+        self.checkouts = 0
+        self.checkout_failures = 0
+        # Les options de pool_created ne contiennent que les valeurs non par défaut
+        self.max_pool_size = settings.mongo_max_pool_size
+
+    def _key(self, event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def pool_created(self, event):
+        self.max_pool_size = event.options.get("maxPoolSize") or self.max_pool_size
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        key = self._key(event)
+        self.open.pop(key, None)
+        self.checked_out.pop(key, None)
+
+    def connection_created(self, event):
+        self.open[self._key(event)] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        key = self._key(event)
+        self.open[key] = max(self.open[key] - 1, 0)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        key = self._key(event)
+        self.checkouts += 1
+        self.checked_out[key] += 1
+        self.peak_checked_out[key] = max(self.peak_checked_out[key], self.checked_out[key])
+
+    def connection_checked_in(self, event):
+        key = self._key(event)
+        self.checked_out[key] = max(self.checked_out[key] - 1, 0)
+
+    def stats(self) -> dict:
+        servers = {}
+        for key in set(self.open) | set(self.checked_out):
+            in_use = self.checked_out[key]
+            servers[key] = {
+                "open": self.open[key],
+                "in_use": in_use,
+                "peak_in_use": self.peak_checked_out[key],
+                "utilization": round(in_use / self.max_pool_size, 4) if self.max_pool_size else None,
+            }
+        return {
+            "pid": os.getpid(),
+            "max_pool_size": self.max_pool_size,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "servers": servers,
+        }
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Durée des commandes et documents renvoyés, par collection et par opération."""
+
+    # Commandes de service du driver, sans intérêt pour l'analyse des handlers
+    IGNORED = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+    def __init__(self):
+        self._collections = {}
+
+    def _key(self, event):
+        return event.connection_id, event.request_id
+
+    def started(self, event):
+        if event.command_name in self.IGNORED:
+            return
+        command = event.command
+        # getMore porte la collection dans un champ dédié, les autres commandes sous leur nom
+        target = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        self._collections[self._key(event)] = target if isinstance(target, str) else event.database_name
+
+    def succeeded(self, event):
+        collection = self._collections.pop(self._key(event), None)
+        if collection is None:
+            return
+        labels = {"collection": collection, "command": event.command_name}
+        metrics.mongo_command_duration.observe(event.duration_micros / 1e6, **labels)
+        cursor = event.reply.get("cursor") if isinstance(event.reply, dict) else None
+        if cursor:
+            batch = cursor.get("firstBatch", cursor.get("nextBatch", ()))
+            metrics.mongo_documents_returned.inc(len(batch), **labels)
+
+    def failed(self, event):
+        collection = self._collections.pop(self._key(event), None)
+        if collection is None:
+            return
+        labels = {"collection": collection, "command": event.command_name}
+        metrics.mongo_command_duration.observe(event.duration_micros / 1e6, **labels)
+        metrics.mongo_command_failures.inc(**labels)
+
+
+pool_monitor = PoolMonitor()
+command_monitor = CommandMonitor()
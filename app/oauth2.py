@@ -3,7 +3,10 @@ from fastapi import Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from typing import Annotated
 from datetime import datetime, timedelta
+import hashlib
+import time
 
+from app.cache import MemoryCache
 from app.config import settings
 from app.models.user import User
 from app.schemas.token import TokenData
@@ -14,6 +17,18 @@ SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
+# Utilisateurs résolus (les hits sont autant de lectures Mongo évitées) ; on y garde
+# le dump du document, chaque requête reçoit sa propre instance User
+user_cache = MemoryCache(
+    max_entries=settings.user_cache_max_entries,
+    default_ttl=settings.user_cache_ttl_seconds,
+)
+# Payloads des jetons déjà vérifiés, conservés au plus jusqu'à leur expiration
+token_cache = MemoryCache(
+    max_entries=settings.user_cache_max_entries,
+    default_ttl=settings.token_cache_ttl_seconds,
+)
+
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -34,6 +49,26 @@ def verify_token(token: str):
         )
 
 
+async def verify_token_cached(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = await token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    ttl = settings.token_cache_ttl_seconds
+    if payload.get("exp") is not None:
+        ttl = min(ttl, int(payload["exp"] - time.time()))
+    if ttl > 0:
+        await token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+async def invalidate_user(user_id) -> None:
+    """À appeler après toute modification d'un utilisateur."""
+    await user_cache.delete(str(user_id))
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_schema)]
 ) -> User:
@@ -43,14 +78,18 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = verify_token(token)
+    payload = await verify_token_cached(token)
 
     try:
         token_data = TokenData(**payload)
         # 🔑 Recherche dans MongoDB avec Beanie
+        cached = await user_cache.get(token_data.user_id)
+        if cached is not None:
+            return User.model_validate(cached)
         user = await User.get(token_data.user_id)
         if user is None:
             raise credentials_exception
+        await user_cache.set(token_data.user_id, user.model_dump())
         return user
     except Exception:
         raise credentials_exception
@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ASCENDING, DESCENDING
+
+
+def encode_cursor(value: Any, doc_id: ObjectId) -> str:
+    """Encode la dernière clé (valeur de tri, _id) d'une page en curseur opaque."""
+    if isinstance(value, datetime):
+        payload = {"t": "dt", "v": value.isoformat()}
+    else:
+        payload = {"t": "n", "v": value}
+    payload["id"] = str(doc_id)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        value = payload["v"]
+        if payload["t"] == "dt":
+            value = datetime.fromisoformat(value)
+        return value, ObjectId(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def sort_spec(field: str, order: str) -> list:
+    direction = DESCENDING if order == "desc" else ASCENDING
+    return [(field, direction), ("_id", direction)]
+
+
+def keyset_filter(field: str, order: str, cursor: Optional[str]) -> dict:
+    """
+    Condition "après le curseur" pour un tri (field, _id).
+    Combinée avec un index (…, field, _id), chaque page reste un parcours d'index borné.
+    """
+    if not cursor:
+        return {}
+    value, doc_id = decode_cursor(cursor)
+    op = "$lt" if order == "desc" else "$gt"
+    return {
+        "$or": [
+            {field: {op: value}},
+            {field: value, "_id": {op: doc_id}},
+        ]
+    }
+
+
+def split_page(docs: list, limit: int, sort_field: str) -> Tuple[list, Optional[str]]:
+    """Coupe la page (limit + 1 documents lus) et calcule le curseur suivant."""
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    last = docs[-1]
+    return docs, encode_cursor(last[sort_field], ObjectId(last["id"]))
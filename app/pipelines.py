@@ -0,0 +1,123 @@
+from typing import List, Optional, Sequence
+
+PROPERTY_FIELDS = [
+    "title", "price", "type", "localisation", "adresse_complet", "description",
+    "surface", "chambres", "salle_de_bain", "equipement", "images", "image_variants", "location", "status", "created_at", "updated_at",
+]
+
+SUMMARY_FIELDS = ["title", "price", "type", "localisation", "surface", "chambres", "status", "created_at"]
+
+# Instantané du propriétaire embarqué dans la propriété (null si non migrée)
+OWNER_FIELD = {"$ifNull": ["$owner_snapshot", None]}
+
+# Champs absents des documents antérieurs : valeur par défaut du schéma de sortie,
+# les projections sont sérialisées telles quelles (sans validation pydantic)
+PROPERTY_DEFAULTS = {"image_variants": [], "location": None, "updated_at": None}
+
+
+def property_projection(extra_fields: Sequence[str] = ()) -> dict:
+    """Forme de sortie de PropertyOut : `id` en chaîne, pas de `_id` ni de DBRef."""
+    return {
+        "_id": 0,
+        "id": {"$toString": "$_id"},
+        **{field: 1 for field in (*PROPERTY_FIELDS, *extra_fields)},
+        **{field: {"$ifNull": [f"${field}", default]} for field, default in PROPERTY_DEFAULTS.items()},
+    }
+
+
+def user_projection() -> dict:
+    """Forme de sortie de UserOut ; le hash du mot de passe n'est jamais lu."""
+    return {
+        "_id": 0,
+        "id": {"$toString": "$_id"},
+        "name": 1, "email": 1, "created_at": 1,
+        "agence": {"$ifNull": ["$agence", None]},
+        "contact": {"$ifNull": ["$contact", None]},
+    }
+
+
+def agency_directory_pipeline(agence: Optional[str] = None) -> List[dict]:
+    """
+    Utilisateurs groupés par agence avec leurs annonces actives, en une agrégation :
+    le comptage par agent passe par l'index owner_created_at de properties.
+    """
+    return [
+        *([{"$match": {"agence": agence}}] if agence is not None else []),
+        {"$project": {"name": 1, "email": 1, "agence": 1, "contact": 1}},
+        {
+            "$lookup": {
+                "from": "properties",
+                "localField": "_id",
+                "foreignField": "owner.$id",
+                "pipeline": [{"$match": {"status": "en cours"}}, {"$count": "n"}],
+                "as": "active",
+            }
+        },
+        {"$sort": {"name": 1}},
+        {
+            "$group": {
+                "_id": "$agence",
+                "agent_count": {"$sum": 1},
+                "active_listings": {"$sum": {"$ifNull": [{"$first": "$active.n"}, 0]}},
+                "agents": {"$push": {
+                    "id": {"$toString": "$_id"},
+                    "name": "$name",
+                    "email": "$email",
+                    "contact": {"$ifNull": ["$contact", None]},
+                    "active_listings": {"$ifNull": [{"$first": "$active.n"}, 0]},
+                }},
+            }
+        },
+        {"$project": {"_id": 0, "agence": "$_id", "agent_count": 1, "active_listings": 1, "agents": 1}},
+        {"$sort": {"active_listings": -1, "agence": 1}},
+    ]
+
+
+def summary_projection(extra_fields: Sequence[str] = ()) -> dict:
+    """Forme de PropertySummary : champs d'une carte de liste et une seule image."""
+    return {
+        "_id": 0,
+        "id": {"$toString": "$_id"},
+        **{field: 1 for field in (*SUMMARY_FIELDS, *extra_fields)},
+        # Vignette de la première image si elle en a une, sinon l'image elle-même
+        "image": {"$let": {
+            "vars": {"first": {"$arrayElemAt": ["$images", 0]}},
+            "in": {"$ifNull": [
+                {"$arrayElemAt": [
+                    {"$map": {
+                        "input": {"$filter": {
+                            "input": {"$ifNull": ["$image_variants", []]},
+                            "cond": {"$eq": ["$$this.image", "$$first"]},
+                        }},
+                        "in": "$$this.thumbnail",
+                    }},
+                    0,
+                ]},
+                {"$ifNull": ["$$first", None]},
+            ]},
+        }},
+    }
+
+
+def sparse_projection(fields: Sequence[str], with_owner: bool = False) -> dict:
+    """Projection `fields=` : seuls les champs demandés sont lus et renvoyés (plus `id`)."""
+    projection = {
+        "_id": 0,
+        "id": {"$toString": "$_id"},
+        **{field: 1 for field in fields if field not in ("id", "owner")},
+    }
+    if with_owner:
+        projection["owner"] = OWNER_FIELD
+    return projection
+
+
+def owner_projection(extra_fields: Sequence[str] = ()) -> dict:
+    """
+    Forme de PropertyOutWithOwner, le propriétaire venant de l'instantané embarqué
+    (aucune jointure) ; `extra_fields` conserve des champs calculés (ex. score).
+    """
+    return {**property_projection(extra_fields), "owner": OWNER_FIELD}
+
+
+def owner_stages(extra_fields: Sequence[str] = ()) -> List[dict]:
+    return [{"$project": owner_projection(extra_fields)}]
@@ -18,12 +18,25 @@ async def login_user(
     # Recherche dans MongoDB avec Beanie
     user = await User.find_one(User.email == user_credentials.username)
 
-    if user is None or not utils.verify(user_credentials.password, user.password):
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid Credentials"
         )
 
+    valid, new_hash = await utils.verify_and_update(user_credentials.password, user.password)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid Credentials"
+        )
+
+    # Re-hachage transparent si le coût bcrypt configuré a changé
+    if new_hash:
+        user.password = new_hash
+        await user.save()
+        await oauth2.invalidate_user(user.id)
+
     # Création du token JWT
     access_token = oauth2.create_access_token(
         data={"user_id": str(user.id), "user_name": user.name}
@@ -0,0 +1,78 @@
+import re
+
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from gridfs.errors import NoFile
+
+from app.config import settings
+from app.mongo_connect import get_gridfs_bucket, iter_stream_chunks
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int):
+    """Renvoie (start, end) inclusifs pour un en-tête Range à plage unique."""
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffixe : les N derniers octets
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+# ------------------------------
+# Servir un fichier GridFS (Range, ETag, cache longue durée)
+# ------------------------------
+@router.get("/{file_id}")
+async def get_media(file_id: str, request: Request):
+    try:
+        stream = await get_gridfs_bucket().open_download_stream(ObjectId(file_id))
+    except NoFile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file ID format")
+
+    size = stream.length
+    metadata = stream.metadata or {}
+    # Les fichiers GridFS sont immuables : l'identifiant suffit comme validateur
+    etag = f'"{file_id}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"public, max-age={settings.media_cache_max_age}, immutable",
+    }
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    start, end = 0, size - 1
+    status_code = status.HTTP_200_OK
+    range_header = request.headers.get("range")
+    if range_header and size and request.headers.get("if-range", etag) == etag:
+        byte_range = parse_range(range_header, size)
+        if byte_range:
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    length = end - start + 1 if size else 0
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        iter_stream_chunks(stream, settings.chunk_size, start, length),
+        status_code=status_code,
+        media_type=metadata.get("contentType", "application/octet-stream"),
+        headers=headers,
+    )
@@ -1,43 +1,226 @@
-import os
-import uuid
+import asyncio
+import csv
+from datetime import datetime, timedelta
+import io
 import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from bson import ObjectId
-from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Form
-from typing import List, Optional
+from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Form, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Annotated, List, Literal, Optional, Tuple, Union
 
-import cloudinary.uploader
-
-from app import oauth2
-from app.models.post import Property
-from app.schemas.post import PropertyOut, PropertyOutWithOwner, PropertyStatusUpdate, UserPublic
+from app import media_index, mongo_connect, oauth2
+from app.bulk import (
+    import_rows,
+    iter_export_csv,
+    iter_export_ndjson,
+    iter_ndjson_lines,
+    parse_csv_row,
+    parse_ndjson_line,
+)
+from app.cache import cache_key, response_cache
+from app.conditional import (
+    PRIVATE_CACHE_CONTROL,
+    evaluate,
+    evaluate_collections,
+    get_cached_body,
+    get_versions,
+    make_etag,
+    public_cache_control,
+    set_cached_body,
+)
+from app.config import settings
+from app.listings import invalidate_public_cache
+from app.models.post import GeoPoint, ImageVariants, OwnerSnapshot, Property, PropertyTombstone
+from app.pagination import decode_cursor, encode_cursor, keyset_filter, sort_spec, split_page
+from app.pipelines import (
+    PROPERTY_FIELDS,
+    owner_projection,
+    owner_stages,
+    property_projection,
+    sparse_projection,
+    summary_projection,
+)
+from app.serialization import json_response
+from app.stats import record_listing_changes
+from app.storage import get_storage
+from app.schemas.post import (
+    FacetCount,
+    ImportReport,
+    PriceBucket,
+    PropertyChanges,
+    PropertyFacets,
+    PropertyFilters,
+    PropertyListParams,
+    PropertyNearPage,
+    PropertyNearParams,
+    PropertyOut,
+    PropertyOutWithOwner,
+    PropertyPage,
+    PropertySearchParams,
+    PropertySummary,
+    PropertySummaryPage,
+    PropertyWithinParams,
+    PropertyStatusUpdate,
+    PropertyViewParams,
+)
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
+# Traitement Pillow dans un pool de processus, créé au premier upload
+_image_pool: Optional[ProcessPoolExecutor] = None
+
 def is_allowed_file(filename: str) -> bool:
     return any(filename.lower().endswith(ext) for ext in ALLOWED_EXTENSIONS)
 
-async def save_upload_file_to_cloudinary(upload_file: UploadFile) -> str:
+def public_properties():
+    """Collection brute des propriétés pour les lectures anonymes (secondaires autorisées)."""
+    return mongo_connect.get_public_collection(Property.Settings.name)
+
+def view_stages(view: PropertyViewParams, extra_fields: Tuple[str, ...] = (), with_owner: bool = True):
+    """
+    Étapes de projection selon `view` / `fields=` : (étapes, champs techniques à retirer).
+    `extra_fields` (clé de tri du curseur) est toujours lu, puis retiré s'il n'a pas été demandé.
+    """
+    fields = view.field_list()
+    if fields:
+        allowed = {"id", *PROPERTY_FIELDS} | ({"owner"} if with_owner else set())
+        unknown = [f for f in fields if f not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s): {', '.join(unknown)}"
+            )
+        helpers = tuple(f for f in extra_fields if f not in fields)
+        stages = [{"$project": sparse_projection([*fields, *helpers], with_owner="owner" in fields)}]
+        return stages, helpers
+    if view.view == "summary":
+        return [{"$project": summary_projection(extra_fields)}], ()
+    if with_owner:
+        return owner_stages(extra_fields), ()
+    return [{"$project": property_projection(extra_fields)}], ()
+
+def revision_of(doc: dict) -> Optional[str]:
+    modified_at = doc.get("updated_at") or doc.get("created_at")
+    return modified_at.isoformat() if modified_at else None
+
+def form_location(latitude: Optional[float], longitude: Optional[float]) -> Optional[GeoPoint]:
+    """Point saisi dans un formulaire : les deux coordonnées ou aucune."""
+    if latitude is None and longitude is None:
+        return None
+    if latitude is None or longitude is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="latitude and longitude must be provided together"
+        )
+    return GeoPoint.from_lat_lng(latitude, longitude)
+
+def strip_fields(docs: list, fields: Tuple[str, ...]) -> list:
+    for doc in docs:
+        for field in fields:
+            doc.pop(field, None)
+    return docs
+
+def check_upload_file(upload_file: UploadFile) -> None:
     if not is_allowed_file(upload_file.filename):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type not allowed ({upload_file.filename})"
         )
-    
-    # Sauvegarde temporaire
-    temp_file_path = f"temp_{uuid.uuid4()}{os.path.splitext(upload_file.filename)[1]}"
-    with open(temp_file_path, "wb") as f:
-        f.write(await upload_file.read())
-    
-    # Upload sur Cloudinary
-    result = cloudinary.uploader.upload(temp_file_path, folder="immobilier")
-    
-    # Supprimer le fichier temporaire
-    os.remove(temp_file_path)
-    
-    return result["secure_url"]  # <- Cette URL sera stockée en DB
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global _image_pool
+    if _image_pool is None:
+        # spawn : un fork hériterait de la boucle d'événements, du client Motor et de leurs threads
+        _image_pool = ProcessPoolExecutor(
+            max_workers=settings.image_process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _image_pool
+
+def shutdown_image_pool() -> None:
+    global _image_pool
+    if _image_pool is not None:
+        _image_pool.shutdown(wait=True, cancel_futures=True)
+        _image_pool = None
+
+async def save_upload_file(upload_file: UploadFile) -> Tuple[str, ImageVariants]:
+    check_upload_file(upload_file)
+
+    # Pillow n'est importé qu'au premier upload (démarrage à froid)
+    from app.images import INVALID_IMAGE_ERRORS, process_image
+
+    # Empreinte calculée pendant la lecture : un contenu déjà stocké n'est ni retraité ni renvoyé
+    data, digest = await media_index.read_and_hash(upload_file, settings.chunk_size)
+    if settings.media_dedup:
+        stored = await media_index.acquire(digest)
+        if stored is not None:
+            url, variants = stored
+            return url, (variants or ImageVariants(thumbnail=url)).model_copy(update={"image": url})
+
+    # Décodage / redimensionnement / encodage WebP dans le pool de processus
+    loop = asyncio.get_running_loop()
+    try:
+        rendered = await loop.run_in_executor(get_image_pool(), process_image, data)
+    except INVALID_IMAGE_ERRORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid image ({upload_file.filename})"
+        )
+
+    # Stockage via le backend configuré (Cloudinary, GridFS ou disque local)
+    storage = get_storage()
+    stem = os.path.splitext(upload_file.filename)[0]
+    names = list(rendered)
+    urls = await asyncio.gather(*(
+        storage.save(rendered[name], f"{stem}_{name}.webp", "image/webp") for name in names
+    ))
+    urls = dict(zip(names, urls))
+
+    original_url = urls.pop("original")
+    thumbnail_url = urls.pop("thumbnail")
+    variants = ImageVariants(image=original_url, thumbnail=thumbnail_url, widths=urls)
+    if settings.media_dedup:
+        stored_url, stored_variants = await media_index.register(digest, original_url, variants)
+        if stored_url != original_url:
+            # Un upload concurrent du même contenu a été indexé avant : notre copie n'est
+            # référencée nulle part, gc_media ne la verrait jamais
+            results = await asyncio.gather(
+                *(storage.delete(url) for url in (original_url, thumbnail_url, *urls.values())),
+                return_exceptions=True,
+            )
+            for error in (r for r in results if isinstance(r, Exception)):
+                logger.warning("Copie en double non supprimée (%s) : %s", digest, error)
+        original_url, variants = stored_url, stored_variants
+    return original_url, variants
+
+async def release_uploads(urls: List[str]) -> None:
+    """Rend les références prises par des uploads dont l'annonce n'a pas été écrite."""
+    if settings.media_dedup and urls:
+        await media_index.release(urls)
+
+async def save_upload_files(upload_files: List[UploadFile]) -> Tuple[List[str], List[ImageVariants]]:
+    """
+    Upload concurrent des images d'une requête, l'ordre des URLs est conservé.
+    Si un fichier échoue, les références des autres sont rendues avant l'erreur.
+    """
+    files = [f for f in upload_files if f.filename]
+    for upload_file in files:
+        check_upload_file(upload_file)
+    saved = await asyncio.gather(*(save_upload_file(f) for f in files), return_exceptions=True)
+    errors = [result for result in saved if isinstance(result, BaseException)]
+    if errors:
+        await release_uploads([result[0] for result in saved if not isinstance(result, BaseException)])
+        raise errors[0]
+    return [url for url, _ in saved], [variants for _, variants in saved]
 
 # ------------------------------
 # Créer une nouvelle propriété
@@ -55,11 +238,15 @@ async def create_property(
     salle_de_bain: int = Form(...),
     equipement: str = Form(...),
     status: str = Form("en cours"),
+    latitude: Optional[float] = Form(None, ge=-90, le=90),
+    longitude: Optional[float] = Form(None, ge=-180, le=180),
     images: List[UploadFile] = File(...),
     current_user: User = Depends(oauth2.get_current_user)
 ):
+    location = form_location(latitude, longitude)
+
     # Upload images sur Cloudinary et récupération des URLs
-    image_urls = [await save_upload_file_to_cloudinary(img) for img in images if img.filename]
+    image_urls, image_variants = await save_upload_files(images)
 
     # Gestion du champ equipement
     try:
@@ -79,12 +266,21 @@ async def create_property(
         chambres=chambres,
         salle_de_bain=salle_de_bain,
         equipement=equipement_list,
-        images=image_urls,  # <-- stocke les URLs Cloudinary
+        images=image_urls,  # <-- stocke les URLs du backend de stockage
+        image_variants=image_variants,
+        location=location,
         owner=current_user,
+        owner_snapshot=OwnerSnapshot.from_user(current_user),
         status=status
     )
 
-    await property_obj.insert()
+    try:
+        await property_obj.insert()
+    except Exception:
+        await release_uploads(image_urls)
+        raise
+    await record_listing_changes(current_user, [(None, (property_obj.status, property_obj.price))])
+    await invalidate_public_cache()
 
     prop_dict = property_obj.dict()
     prop_dict["id"] = str(property_obj.id)
@@ -93,117 +289,376 @@ async def create_property(
     return PropertyOut(**prop_dict)
 
 # ------------------------------
-# Récupérer toutes les propriétés publiques
+# Récupérer toutes les propriétés publiques (paginées par curseur)
 # ------------------------------
-@router.get("/public/all", response_model=List[PropertyOutWithOwner])
-async def get_all_properties():
-    properties = await Property.find(Property.status == "en cours").to_list()
-    
-    # Collecter tous les owner IDs
-    owner_ids = [str(prop.owner.ref.id) for prop in properties if prop.owner and hasattr(prop.owner, "ref")]
-
-    # Charger tous les owners en une seule requête
-    owners_dict = {}
-    if owner_ids:
-        owners = await User.find({"_id": {"$in": owner_ids}}).to_list()
-        owners_dict = {str(owner.id): owner for owner in owners}
-    
-    results = []
-    for prop in properties:
-        owner_data = None
-        if prop.owner and hasattr(prop.owner, "ref"):
-            owner_id = str(prop.owner.ref.id)
-            if owner_id in owners_dict:
-                owner = owners_dict[owner_id]
-                owner_data = UserPublic(
-                    name=owner.name,
-                    email=owner.email,
-                    agence=owner.agence,
-                    contact=owner.contact
-                )
-        results.append(PropertyOutWithOwner(
-            id=str(prop.id),
-            title=prop.title,
-            price=prop.price,
-            type=prop.type,
-            localisation=prop.localisation,
-            adresse_complet=prop.adresse_complet,
-            description=prop.description,
-            surface=prop.surface,
-            chambres=prop.chambres,
-            salle_de_bain=prop.salle_de_bain,
-            equipement=prop.equipement,
-            images=prop.images,
-            status=prop.status,
-            owner=owner_data,
-            created_at=prop.created_at
-        ))
-    return results
+# view=summary : PropertySummaryPage ; fields= : sous-ensemble des champs de PropertyPage
+@router.get("/public/all", response_model=Union[PropertyPage, PropertySummaryPage])
+async def get_all_properties(params: Annotated[PropertyListParams, Query()], request: Request):
+    key = cache_key("public:all", params.model_dump(exclude_none=True))
+    not_modified, headers = await evaluate_collections(
+        request, key, (Property.Settings.name,), public_cache_control(), public=True,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    cached = await get_cached_body(key, headers["ETag"])
+    if cached is not None:
+        return json_response(cached, headers=headers)
+
+    query = {"status": "en cours", **params.to_mongo()}
+    query.update(keyset_filter(params.sort, params.order, params.cursor))
+
+    stages, helpers = view_stages(params, extra_fields=(params.sort,))
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(sort_spec(params.sort, params.order))},
+        {"$limit": params.limit + 1},
+        *stages,
+    ]
+    docs = await public_properties().aggregate(pipeline).to_list(None)
+
+    docs, next_cursor = split_page(docs, params.limit, params.sort)
+    page = {"items": strip_fields(docs, helpers), "next_cursor": next_cursor}
+    await set_cached_body(key, headers["ETag"], page)
+    return json_response(page, headers=headers)
+
+# ------------------------------
+# Recherche plein texte (pertinence décroissante, paginée par curseur)
+# ------------------------------
+@router.get("/search", response_model=PropertyPage)
+async def search_properties(params: Annotated[PropertySearchParams, Query()]):
+    key = cache_key("public:search", params.model_dump(exclude_none=True))
+    cached = await response_cache.get(key)
+    if cached is not None:
+        return json_response(cached)
+
+    query = {
+        "$text": {"$search": params.q, "$language": "french"},
+        "status": "en cours",
+        **params.to_mongo(),
+    }
+    pipeline = [
+        {"$match": query},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$match": keyset_filter("score", "desc", params.cursor)},
+        {"$sort": dict(sort_spec("score", "desc"))},
+        {"$limit": params.limit + 1},
+        *owner_stages(extra_fields=("score",)),
+    ]
+    docs = await public_properties().aggregate(pipeline).to_list(None)
+
+    docs, next_cursor = split_page(docs, params.limit, "score")
+    payload = {"items": strip_fields(docs, ("score",)), "next_cursor": next_cursor}
+    await response_cache.set(key, payload)
+    return json_response(payload)
+
+# ------------------------------
+# Propriétés autour d'un point (distance croissante, paginées par curseur)
+# ------------------------------
+@router.get("/near", response_model=PropertyNearPage)
+async def get_properties_near(params: Annotated[PropertyNearParams, Query()]):
+    key = cache_key("public:geo:near", params.model_dump(exclude_none=True))
+    cached = await response_cache.get(key)
+    if cached is not None:
+        return json_response(cached)
+
+    pipeline = [
+        {
+            "$geoNear": {
+                "near": GeoPoint.from_lat_lng(params.lat, params.lng).model_dump(),
+                "distanceField": "distance",
+                "maxDistance": params.radius_km * 1000,
+                "query": {"status": "en cours", **params.to_mongo()},
+                "spherical": True,
+            }
+        },
+        {"$match": keyset_filter("distance", "asc", params.cursor)},
+        {"$sort": dict(sort_spec("distance", "asc"))},
+        {"$limit": params.limit + 1},
+        *owner_stages(extra_fields=("distance",)),
+    ]
+    docs = await public_properties().aggregate(pipeline).to_list(None)
+
+    docs, next_cursor = split_page(docs, params.limit, "distance")
+    payload = {"items": docs, "next_cursor": next_cursor}
+    await response_cache.set(key, payload)
+    return json_response(payload)
+
+# ------------------------------
+# Propriétés dans un rectangle (même tri et pagination que /public/all)
+# ------------------------------
+@router.get("/within", response_model=Union[PropertyPage, PropertySummaryPage])
+async def get_properties_within(params: Annotated[PropertyWithinParams, Query()]):
+    key = cache_key("public:geo:within", params.model_dump(exclude_none=True))
+    cached = await response_cache.get(key)
+    if cached is not None:
+        return json_response(cached)
+
+    query = {
+        "status": "en cours",
+        "location": {"$geoWithin": {"$geometry": params.bbox_polygon()}},
+        **params.to_mongo(),
+    }
+    query.update(keyset_filter(params.sort, params.order, params.cursor))
+    stages, helpers = view_stages(params, extra_fields=(params.sort,))
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(sort_spec(params.sort, params.order))},
+        {"$limit": params.limit + 1},
+        *stages,
+    ]
+    docs = await public_properties().aggregate(pipeline).to_list(None)
+
+    docs, next_cursor = split_page(docs, params.limit, params.sort)
+    page = {"items": strip_fields(docs, helpers), "next_cursor": next_cursor}
+    await response_cache.set(key, page)
+    return json_response(page)
+
+# ------------------------------
+# Compteurs de facettes (type, localisation, chambres, tranches de prix)
+# ------------------------------
+@router.get("/facets", response_model=PropertyFacets)
+async def get_property_facets(filters: Annotated[PropertyFilters, Query()]):
+    key = cache_key("public:facets", filters.model_dump(exclude_none=True))
+    cached = await response_cache.get(key)
+    if cached is not None:
+        return json_response(cached)
+
+    boundaries = settings.facet_price_boundaries
+    pipeline = [
+        {"$match": {"status": "en cours", **filters.to_mongo()}},
+        {
+            "$facet": {
+                "total": [{"$count": "count"}],
+                "type": [{"$sortByCount": "$type"}],
+                "localisation": [
+                    {"$sortByCount": "$localisation"},
+                    {"$limit": settings.facets_max_localisations},
+                ],
+                "chambres": [
+                    {"$group": {"_id": "$chambres", "count": {"$sum": 1}}},
+                    {"$sort": {"_id": 1}},
+                ],
+                "price": [
+                    {
+                        "$bucket": {
+                            "groupBy": "$price",
+                            "boundaries": boundaries,
+                            "default": "other",
+                            "output": {"count": {"$sum": 1}},
+                        }
+                    }
+                ],
+            }
+        },
+    ]
+    docs = await public_properties().aggregate(pipeline).to_list(None)
+    facets = docs[0]
+
+    price_buckets = []
+    for bucket in facets["price"]:
+        if bucket["_id"] == "other":
+            price_buckets.append(PriceBucket(min=boundaries[-1], count=bucket["count"]))
+        else:
+            upper = boundaries[boundaries.index(bucket["_id"]) + 1]
+            price_buckets.append(PriceBucket(min=bucket["_id"], max=upper, count=bucket["count"]))
+
+    def counts(name):
+        return [FacetCount(value=b["_id"], count=b["count"]) for b in facets[name]]
+
+    result = PropertyFacets(
+        total=facets["total"][0]["count"] if facets["total"] else 0,
+        type=counts("type"),
+        localisation=counts("localisation"),
+        chambres=counts("chambres"),
+        price=price_buckets,
+    )
+    payload = result.model_dump(mode="json")
+    await response_cache.set(key, payload, ttl=settings.facets_cache_ttl_seconds)
+    return json_response(payload)
+
+# ------------------------------
+# Synchronisation incrémentale : insertions, modifications et suppressions après `since`
+# ------------------------------
+@router.get("/changes", response_model=PropertyChanges)
+async def get_property_changes(
+    since: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500)
+):
+    since_key = decode_cursor(since) if since else None
+    if since_key:
+        since_ts = since_key[0]
+        if not isinstance(since_ts, datetime):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if since_ts < datetime.utcnow() - timedelta(days=settings.tombstone_retention_days):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Cursor expired, full resync required"
+            )
+
+    # Lecture sur le primaire : un secondaire en retard ferait sauter des changements
+    docs = await mongo_connect.db[Property.Settings.name].aggregate([
+        # Documents sans updated_at (backfill_updated_at pas encore passé) : ignorés,
+        # ils ne peuvent ni être ordonnés ni servir de curseur
+        {"$match": {"updated_at": {"$type": "date"}, **keyset_filter("updated_at", "asc", since)}},
+        {"$sort": dict(sort_spec("updated_at", "asc"))},
+        {"$limit": limit + 1},
+        *owner_stages(),
+    ]).to_list(None)
+    tombstones = await mongo_connect.db[PropertyTombstone.Settings.name].find(
+        keyset_filter("deleted_at", "asc", since)
+    ).sort(sort_spec("deleted_at", "asc")).limit(limit + 1).to_list(None)
+
+    # Fusion des deux flux selon (horodatage, _id)
+    events = sorted(
+        [(doc["updated_at"], ObjectId(doc["id"]), doc) for doc in docs]
+        + [(t["deleted_at"], t["_id"], t) for t in tombstones],
+        key=lambda e: (e[0], e[1]),
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    # Un même bien ne figure qu'une fois dans la page : on garde son dernier événement
+    latest = {}
+    for event in events:
+        latest[str(event[2].get("property_id", event[1]))] = event
+    page = sorted(latest.values(), key=lambda e: (e[0], e[1]))
+    upserts = [e[2] for e in page if "deleted_at" not in e[2]]
+    deletes = [str(e[2]["property_id"]) for e in page if "deleted_at" in e[2]]
+
+    # updated_at vient de l'horloge des workers : une écriture validée en retard peut porter
+    # une date antérieure au dernier événement lu. Une fois la file rattrapée, le curseur
+    # ne dépasse pas maintenant - sync_overlap_seconds ; la fenêtre est relue au tour
+    # suivant et les clients dédoublonnent par id (upserts idempotents).
+    last = (events[-1][0], events[-1][1]) if events else since_key
+    horizon = (datetime.utcnow() - timedelta(seconds=settings.sync_overlap_seconds), ObjectId("0" * 24))
+    if last is not None and not has_more and last > horizon:
+        last = horizon
+    next_cursor = encode_cursor(*last) if last else None
+
+    return json_response({
+        "upserts": upserts,
+        "deletes": deletes,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    })
+
+# ------------------------------
+# Export du catalogue public en flux (NDJSON ou CSV), mémoire constante
+# ------------------------------
+@router.get("/export")
+async def export_properties(format: Literal["ndjson", "csv"] = "ndjson"):
+    collection = public_properties()
+    query = {"status": "en cours"}
+    if format == "csv":
+        return StreamingResponse(
+            iter_export_csv(collection, query, settings.export_batch_size),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="properties.csv"'},
+        )
+    return StreamingResponse(
+        iter_export_ndjson(collection, query, settings.export_batch_size),
+        media_type="application/x-ndjson",
+    )
+
+# ------------------------------
+# Import en masse (NDJSON ou CSV) pour l'utilisateur connecté
+# ------------------------------
+@router.post("/import", response_model=ImportReport)
+async def import_properties(
+    file: UploadFile = File(...),
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    # Lecture bloquante du fichier temporaire : faite par blocs dans le pool de threads (import_rows)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    if file.filename.lower().endswith(".csv"):
+        rows, parse = csv.DictReader(stream), parse_csv_row
+    else:
+        rows, parse = iter_ndjson_lines(stream), parse_ndjson_line
+
+    async def record_batch(batch: List[Property]) -> None:
+        await record_listing_changes(current_user, [(None, (p.status, p.price)) for p in batch])
+        # Les URLs déjà indexées (export ré-importé) sont référencées comme à l'upload :
+        # la suppression de l'annonce importée rendra exactement ces références
+        if settings.media_dedup:
+            await media_index.retain(url for p in batch for url in p.images)
+
+    report = await import_rows(rows, parse, current_user, settings.import_batch_size, on_insert=record_batch)
+    if report.inserted:
+        await invalidate_public_cache()
+    return report
 
 # ------------------------------
 # Récupérer les propriétés d'un utilisateur
 # ------------------------------
-@router.get("/my-properties", response_model=List[PropertyOut])
-async def get_my_properties(current_user: User = Depends(oauth2.get_current_user)):
-    properties = await Property.find({"owner.$id": current_user.id}).to_list()
-    results = [PropertyOut(
-        id=str(prop.id),
-        title=prop.title,
-        price=prop.price,
-        type=prop.type,
-        localisation=prop.localisation,
-        adresse_complet=prop.adresse_complet,
-        description=prop.description,
-        surface=prop.surface,
-        chambres=prop.chambres,
-        salle_de_bain=prop.salle_de_bain,
-        equipement=prop.equipement,
-        images=prop.images,
-        status=prop.status,
-        created_at=prop.created_at
-    ) for prop in properties]
-    return results
+@router.get("/my-properties", response_model=Union[List[PropertyOut], List[PropertySummary]])
+async def get_my_properties(
+    view: Annotated[PropertyViewParams, Query()],
+    request: Request,
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    not_modified, headers = await evaluate_collections(
+        request,
+        cache_key(f"my:{current_user.id}", view.model_dump(exclude_none=True)),
+        (Property.Settings.name,),
+        PRIVATE_CACHE_CONTROL,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    stages, _ = view_stages(view, with_owner=False)
+    # Lecture authentifiée : collection sur le primaire
+    docs = await mongo_connect.db[Property.Settings.name].aggregate([
+        {"$match": {"owner.$id": current_user.id}},
+        {"$sort": {"created_at": -1}},
+        *stages,
+    ]).to_list(None)
+    return json_response(docs, headers=headers)
 
 # ------------------------------
 # Récupérer une propriété spécifique
 # ------------------------------
 @router.get("/public/{property_id}", response_model=PropertyOutWithOwner)
-async def get_property_details(property_id: str):
+async def get_property_details(property_id: str, request: Request):
     try:
-        property_obj = await Property.get(ObjectId(property_id))
+        object_id = ObjectId(property_id)
     except Exception:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid property ID format")
 
-    if not property_obj:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
+    # L'entrée en cache porte la révision du document (l'instantané du propriétaire
+    # avance aussi updated_at) et la version de la collection lue avant le document
+    key = cache_key(f"public:detail:{property_id}")
+    version = (await get_versions(Property.Settings.name, public=True))[Property.Settings.name][0]
+    entry = await response_cache.get(key)
+    if entry is not None and entry["version"] != version:
+        # La collection a changé depuis la mise en cache : lecture indexée minuscule
+        # de la révision, le corps n'est rechargé que si ce document a bougé
+        revision = await public_properties().find_one({"_id": object_id}, {"updated_at": 1, "created_at": 1})
+        if revision is None or revision_of(revision) != entry["last_modified"]:
+            entry = None
+        else:
+            entry["version"] = version
+            await response_cache.set(key, entry)
 
-    owner_data = None
-    if property_obj.owner and hasattr(property_obj.owner, "ref"):
-        owner = await User.get(property_obj.owner.ref.id)
-        if owner:
-            owner_data = UserPublic(
-                name=owner.name,
-                email=owner.email,
-                agence=owner.agence,
-                contact=owner.contact
-            )
-    return PropertyOutWithOwner(
-        id=str(property_obj.id),
-        title=property_obj.title,
-        price=property_obj.price,
-        type=property_obj.type,
-        localisation=property_obj.localisation,
-        adresse_complet=property_obj.adresse_complet,
-        description=property_obj.description,
-        surface=property_obj.surface,
-        chambres=property_obj.chambres,
-        salle_de_bain=property_obj.salle_de_bain,
-        equipement=property_obj.equipement,
-        images=property_obj.images,
-        status=property_obj.status,
-        owner=owner_data,
-        created_at=property_obj.created_at
-    )
+    if entry is None:
+        # Un seul document d'une seule collection, déjà à la forme de sortie
+        doc = await public_properties().find_one({"_id": object_id}, owner_projection())
+        if doc is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
+        modified_at = revision_of(doc)
+        entry = {
+            "version": version,
+            "etag": make_etag(property_id, modified_at or ""),
+            "last_modified": modified_at,
+            "body": doc,
+        }
+        await response_cache.set(key, entry)
+
+    last_modified = datetime.fromisoformat(entry["last_modified"]) if entry["last_modified"] else None
+    not_modified, headers = evaluate(request, entry["etag"], last_modified, public_cache_control())
+    if not_modified is not None:
+        return not_modified
+    return json_response(entry["body"], headers=headers)
 
 # ------------------------------
 # Mettre à jour le statut d'une propriété
@@ -221,8 +676,11 @@ async def update_property_status(
     if not (property_obj.owner and hasattr(property_obj.owner, "ref")) or property_obj.owner.ref.id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized")
 
-    property_obj.status = status_update.status
-    await property_obj.save()
+    before = (property_obj.status, property_obj.price)
+    # $set partiel : owner_snapshot n'est écrit que par refresh_owner_snapshots
+    await property_obj.set({"status": status_update.status, "updated_at": datetime.utcnow()})
+    await record_listing_changes(current_user, [(before, (property_obj.status, property_obj.price))])
+    await invalidate_public_cache(property_id)
     
     return PropertyOut(**property_obj.dict())
 
@@ -242,6 +700,8 @@ async def update_property(
     chambres: Optional[int] = Form(None),
     salle_de_bain: Optional[int] = Form(None),
     equipement: Optional[str] = Form(None),
+    latitude: Optional[float] = Form(None, ge=-90, le=90),
+    longitude: Optional[float] = Form(None, ge=-180, le=180),
     images: Optional[List[UploadFile]] = File(None),
     current_user: User = Depends(oauth2.get_current_user)
 ):
@@ -255,25 +715,51 @@ async def update_property(
     if not (property_obj.owner and hasattr(property_obj.owner, "ref")) or property_obj.owner.ref.id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized")
 
-    # Mise à jour partielle
-    for field, value in [("title", title), ("price", price), ("type", type),
-                         ("localisation", localisation), ("adresse_complet", adresse_complet),
-                         ("description", description), ("surface", surface),
-                         ("chambres", chambres), ("salle_de_bain", salle_de_bain)]:
-        if value is not None:
-            setattr(property_obj, field, value)
+    before = (property_obj.status, property_obj.price)
+
+    # Mise à jour partielle : seuls les champs fournis sont écrits ($set / $push),
+    # owner_snapshot n'est écrit que par refresh_owner_snapshots
+    changes = {
+        field: value
+        for field, value in [("title", title), ("price", price), ("type", type),
+                             ("localisation", localisation), ("adresse_complet", adresse_complet),
+                             ("description", description), ("surface", surface),
+                             ("chambres", chambres), ("salle_de_bain", salle_de_bain)]
+        if value is not None
+    }
 
     if equipement is not None:
         try:
-            property_obj.equipement = json.loads(equipement)
+            changes["equipement"] = json.loads(equipement)
         except json.JSONDecodeError:
-            property_obj.equipement = [equipement]
+            changes["equipement"] = [equipement]
+
+    location = form_location(latitude, longitude)
+    if location is not None:
+        changes["location"] = location.model_dump()
+
+    changes["updated_at"] = datetime.utcnow()
+    update = {"$set": changes}
 
+    new_image_urls = []
     if images:
-        new_image_urls = [await save_upload_file_to_cloudinary(img) for img in images if img.filename]
-        property_obj.images.extend(new_image_urls)
+        new_image_urls, new_variants = await save_upload_files(images)
+        update["$push"] = {
+            "images": {"$each": new_image_urls},
+            "image_variants": {"$each": [variants.model_dump() for variants in new_variants]},
+        }
 
-    await property_obj.save()
+    try:
+        await property_obj.update(update)
+    except Exception:
+        await release_uploads(new_image_urls)
+        raise
+    if price is not None:
+        await record_listing_changes(current_user, [(before, (property_obj.status, property_obj.price))])
+    await invalidate_public_cache(
+        property_id,
+        facets=any(v is not None for v in (price, type, localisation, chambres)),
+    )
     return PropertyOut(**property_obj.dict())
 
 # ------------------------------
@@ -291,5 +777,11 @@ async def delete_property(property_id: str, current_user: User = Depends(oauth2.
     if not (property_obj.owner and hasattr(property_obj.owner, "ref")) or property_obj.owner.ref.id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized")
 
+    # La trace est écrite avant la suppression : une suppression ne peut pas échapper à la synchro
+    await PropertyTombstone(property_id=property_obj.id).insert()
     await property_obj.delete()
+    await record_listing_changes(current_user, [((property_obj.status, property_obj.price), None)])
+    if settings.media_dedup:
+        await media_index.release(property_obj.images)
+    await invalidate_public_cache(property_id)
     return None
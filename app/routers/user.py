@@ -1,8 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+import asyncio
+from typing import Annotated, List, Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from app import mongo_connect
+from app.conditional import bump_version, evaluate_collections, public_cache_control
+from app.pagination import keyset_filter, split_page
+from app.pipelines import agency_directory_pipeline, user_projection
+from app.listings import refresh_owner_snapshots
+from app.serialization import LISTING_STATS, json_response, to_jsonable
+from app.stats import agency_stats_id, get_stats, owner_stats_id, stats_payload
 from app.models.user import User
-from app.schemas.user import UserCreate, UserOut, UserRequest, UserUpdateContact
-from app.oauth2 import get_current_user
-from app.utils import hashed, send_account_created_email, send_user_request_email
+from app.schemas.post import ListingStats
+from app.schemas.user import (
+    AgencyDirectoryEntry,
+    UserCreate,
+    UserListParams,
+    UserOut,
+    UserPage,
+    UserRequest,
+    UserUpdateContact,
+)
+from app.oauth2 import get_current_user, invalidate_user
+from app.utils import hash_password, send_account_created_email, send_user_request_email
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -20,11 +40,12 @@ async def create_user(user: UserCreate):
     user_obj = User(
         name=user.name,
         email=user.email,
-        password=hashed(user.password),
+        password=await hash_password(user.password),
         agence=user.agence,
         contact=user.contact
     )
     await user_obj.insert()
+    await bump_version(User.Settings.name)
     
     return UserOut(
         id=str(user_obj.id),
@@ -36,22 +57,32 @@ async def create_user(user: UserCreate):
     )
 
 # ---------------------------
-# Récupérer tous les utilisateurs
+# Récupérer les utilisateurs (paginés par curseur, filtrables par agence)
 # ---------------------------
-@router.get("/all", response_model=list[UserOut])
-async def get_all_users():
-    users = await User.find_all().to_list()
-    return [
-        UserOut(
-            id=str(user.id),
-            name=user.name,
-            email=user.email,
-            agence=user.agence,
-            contact=user.contact,
-            created_at=user.created_at
-        )
-        for user in users
-    ]
+@router.get("/all", response_model=UserPage)
+async def get_all_users(params: Annotated[UserListParams, Query()]):
+    query = {"agence": params.agence} if params.agence is not None else {}
+    query.update(keyset_filter("created_at", "desc", params.cursor))
+
+    docs = await mongo_connect.get_public_collection(User.Settings.name).aggregate([
+        {"$match": query},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": params.limit + 1},
+        {"$project": user_projection()},
+    ]).to_list(None)
+
+    docs, next_cursor = split_page(docs, params.limit, "created_at")
+    return json_response({"items": docs, "next_cursor": next_cursor})
+
+# ---------------------------
+# Annuaire des agences (agents et annonces actives)
+# ---------------------------
+@router.get("/agencies", response_model=List[AgencyDirectoryEntry])
+async def get_agency_directory(agence: Optional[str] = None):
+    docs = await mongo_connect.get_public_collection(User.Settings.name).aggregate(
+        agency_directory_pipeline(agence)
+    ).to_list(None)
+    return json_response(docs)
 
 # ---------------------------
 # Récupérer le profil de l'utilisateur connecté
@@ -67,31 +98,60 @@ async def get_user_infos(current_user: User = Depends(get_current_user)):
         created_at=current_user.created_at
     )
 
+# ---------------------------
+# Statistiques d'annonces de l'utilisateur connecté (lecture d'un seul document)
+# ---------------------------
+@router.get("/me/stats", response_model=ListingStats)
+async def get_my_stats(current_user: User = Depends(get_current_user)):
+    doc = await get_stats(owner_stats_id(current_user.id))
+    return json_response(to_jsonable(LISTING_STATS, stats_payload(doc, "owner", str(current_user.id))))
+
+# ---------------------------
+# Statistiques d'annonces d'une agence (réservées à ses membres)
+# ---------------------------
+@router.get("/agencies/{agence}/stats", response_model=ListingStats)
+async def get_agency_stats(agence: str, current_user: User = Depends(get_current_user)):
+    if current_user.agence != agence:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized")
+    doc = await get_stats(agency_stats_id(agence))
+    return json_response(to_jsonable(LISTING_STATS, stats_payload(doc, "agency", agence)))
+
 # ---------------------------
 # Récupérer un utilisateur par ID
 # ---------------------------
 @router.get("/{user_id}", response_model=UserOut)
-async def get_user(user_id: str):
-    user = await User.get(user_id)
-    if not user:
+async def get_user(user_id: str, request: Request):
+    try:
+        object_id = ObjectId(user_id)
+    except Exception:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    return UserOut(
-        id=str(user.id),
-        name=user.name,
-        email=user.email,
-        agence=user.agence,
-        contact=user.contact,
-        created_at=user.created_at
+
+    not_modified, headers = await evaluate_collections(
+        request, f"user:{user_id}", (User.Settings.name,), public_cache_control(), public=True,
     )
+    if not_modified is not None:
+        return not_modified
+
+    # Lecture anonyme : secondaires autorisées, le hash du mot de passe n'est pas lu
+    docs = await mongo_connect.get_public_collection(User.Settings.name).aggregate([
+        {"$match": {"_id": object_id}},
+        {"$project": user_projection()},
+    ]).to_list(None)
+    if not docs:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return json_response(docs[0], headers=headers)
 
 # ---------------------------
 # Mettre à jour le contact de l'utilisateur connecté
 # ---------------------------
 @router.patch("/contact", response_model=UserOut)
 async def update_own_contact(update: UserUpdateContact, current_user: User = Depends(get_current_user)):
-    current_user.contact = update.contact
-    await current_user.save()
+    # $set partiel : l'instance peut venir du cache d'utilisateurs
+    await current_user.set({"contact": update.contact})
+    await invalidate_user(current_user.id)
+    await bump_version(User.Settings.name)
+    await refresh_owner_snapshots(current_user)
     
     return UserOut(
         id=str(current_user.id),
@@ -109,15 +169,15 @@ async def create_user_request(request: UserRequest):
     L'utilisateur remplit sa demande → email envoyé à l'admin
     """
     try:
-        await send_user_request_email(
+        job_id = send_user_request_email(
             name=request.name,
             email=request.email,
             agence=request.agence,
             contact=request.contact
         )
-        return {"message": "Votre demande a été envoyée avec succès."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors de l'envoi de l'email : {e}")
+        return {"message": "Votre demande a été enregistrée et sera envoyée sous peu.", "job_id": job_id}
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="File d'envoi d'emails saturée, réessayez plus tard")
     
 
 @router.post("/send-account-email", status_code=status.HTTP_200_OK)
@@ -126,13 +186,13 @@ async def send_account_email(client_email: str, client_name: str, password: str)
     Envoie un email au client avec ses identifiants après que l'admin ait créé son compte
     """
     try:
-        await send_account_created_email(
+        job_id = send_account_created_email(
             client_email=client_email,
             client_name=client_name,
             password=password
         )
-        return {"message": f"Email envoyé avec succès à {client_email}"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors de l'envoi de l'email : {e}")
+        return {"message": f"Email en file d'envoi pour {client_email}", "job_id": job_id}
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="File d'envoi d'emails saturée, réessayez plus tard")
     
     
\ No newline at end of file
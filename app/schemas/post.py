@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, ConfigDict, EmailStr, validator
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator, validator
 
 class UserPublic(BaseModel):
     name: str
@@ -8,6 +8,15 @@ class UserPublic(BaseModel):
     agence: str
     contact: str
 
+class ImageVariantsOut(BaseModel):
+    image: Optional[str] = None
+    thumbnail: str
+    widths: Dict[str, str] = {}
+
+class GeoPointOut(BaseModel):
+    type: str = "Point"
+    coordinates: List[float]
+
 class PropertyOut(BaseModel):
     id: str
     title: str
@@ -22,8 +31,11 @@ class PropertyOut(BaseModel):
     salle_de_bain: int
     equipement: List[str]
     images: List[str]  
+    image_variants: List[ImageVariantsOut] = []
+    location: Optional[GeoPointOut] = None
     status: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -31,6 +43,177 @@ class PropertyOutWithOwner(PropertyOut):
     owner: Optional[UserPublic]
 
 
+class PropertySummary(BaseModel):
+    id: str
+    title: str
+    price: float
+    type: str
+    localisation: str
+    surface: float
+    chambres: int
+    status: str
+    image: Optional[str] = None
+    created_at: datetime
+
+
+class PropertySummaryPage(BaseModel):
+    items: List[PropertySummary]
+    next_cursor: Optional[str] = None
+
+
+class PropertyPage(BaseModel):
+    items: List[PropertyOutWithOwner]
+    next_cursor: Optional[str] = None
+
+
+class PropertyWithDistance(PropertyOutWithOwner):
+    distance: float  # en mètres
+
+
+class PropertyNearPage(BaseModel):
+    items: List[PropertyWithDistance]
+    next_cursor: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    value: Optional[str | int] = None
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min: Optional[float] = None  # None : au-delà de la dernière borne
+    max: Optional[float] = None
+    count: int
+
+
+class PropertyFacets(BaseModel):
+    total: int
+    type: List[FacetCount]
+    localisation: List[FacetCount]
+    chambres: List[FacetCount]
+    price: List[PriceBucket]
+
+
+class PropertyChanges(BaseModel):
+    upserts: List[PropertyOutWithOwner]
+    deletes: List[str]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
+class PropertyFilters(BaseModel):
+    type: Optional[str] = None
+    localisation: Optional[str] = None
+    price_min: Optional[float] = Field(None, ge=0)
+    price_max: Optional[float] = Field(None, ge=0)
+    surface_min: Optional[float] = Field(None, ge=0)
+    surface_max: Optional[float] = Field(None, ge=0)
+    chambres_min: Optional[int] = Field(None, ge=0)
+    salle_de_bain_min: Optional[int] = Field(None, ge=0)
+
+    def to_mongo(self) -> dict:
+        query = {}
+        if self.type is not None:
+            query["type"] = self.type
+        if self.localisation is not None:
+            query["localisation"] = self.localisation
+        for field, low, high in [("price", self.price_min, self.price_max),
+                                 ("surface", self.surface_min, self.surface_max),
+                                 ("chambres", self.chambres_min, None),
+                                 ("salle_de_bain", self.salle_de_bain_min, None)]:
+            bounds = {}
+            if low is not None:
+                bounds["$gte"] = low
+            if high is not None:
+                bounds["$lte"] = high
+            if bounds:
+                query[field] = bounds
+        return query
+
+
+class PropertySearchParams(PropertyFilters):
+    q: str = Field(..., min_length=1, max_length=200)
+    limit: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None
+
+
+class PropertyViewParams(BaseModel):
+    view: Literal["full", "summary"] = "full"
+    fields: Optional[str] = Field(None, description="Champs séparés par des virgules, ex. title,price,images")
+
+    def field_list(self) -> Optional[List[str]]:
+        if not self.fields:
+            return None
+        return [f.strip() for f in self.fields.split(",") if f.strip()]
+
+
+class PropertyListParams(PropertyFilters, PropertyViewParams):
+    sort: Literal["created_at", "price", "surface", "chambres", "salle_de_bain"] = "created_at"
+    order: Literal["asc", "desc"] = "desc"
+    limit: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None
+
+
+class PropertyNearParams(PropertyFilters):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    radius_km: float = Field(3, gt=0, le=100)
+    limit: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None
+
+
+class PropertyWithinParams(PropertyListParams):
+    south: float = Field(..., ge=-90, le=90)
+    west: float = Field(..., ge=-180, le=180)
+    north: float = Field(..., ge=-90, le=90)
+    east: float = Field(..., ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def check_bbox(self):
+        # Un rectangle inversé donnerait un polygone vide (ou le reste du globe)
+        if self.south >= self.north:
+            raise ValueError("south must be lower than north")
+        if self.west >= self.east:
+            raise ValueError("west must be lower than east (boxes across the antimeridian are not supported)")
+        return self
+
+    def bbox_polygon(self) -> dict:
+        return {
+            "type": "Polygon",
+            "coordinates": [[
+                [self.west, self.south], [self.east, self.south],
+                [self.east, self.north], [self.west, self.north],
+                [self.west, self.south],
+            ]],
+        }
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class ImportReport(BaseModel):
+    inserted: int
+    errors: List[ImportRowError]
+
+
+class StatusStats(BaseModel):
+    count: int
+    price_sum: float
+    average_price: Optional[float] = None
+
+
+class ListingStats(BaseModel):
+    scope: Literal["owner", "agency"]
+    key: str
+    total: int
+    price_sum: float
+    average_price: Optional[float] = None
+    by_status: Dict[str, StatusStats]
+    updated_at: Optional[datetime] = None
+
+
 class PropertyStatusUpdate(BaseModel):
     status: str
     
@@ -1,6 +1,6 @@
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 
 
 class UserBase(BaseModel):
@@ -27,6 +27,32 @@ class UserOut(BaseModel):
     }
 
 
+class UserPage(BaseModel):
+    items: List[UserOut]
+    next_cursor: Optional[str] = None
+
+
+class UserListParams(BaseModel):
+    agence: Optional[str] = None
+    limit: int = Field(50, ge=1, le=200)
+    cursor: Optional[str] = None
+
+
+class AgencyAgent(BaseModel):
+    id: str
+    name: str
+    email: EmailStr
+    contact: Optional[str] = None
+    active_listings: int = 0
+
+
+class AgencyDirectoryEntry(BaseModel):
+    agence: Optional[str] = None
+    agent_count: int
+    active_listings: int
+    agents: List[AgencyAgent]
+
+
 class UserUpdateContact(BaseModel):
     contact: str
 
@@ -0,0 +1,27 @@
+"""
+Chemin de sérialisation rapide des endpoints de lecture.
+
+Les documents projetés par Mongo sont déjà à la forme de sortie (pipelines.py :
+`id` en chaîne, défauts par $ifNull) : ils sont passés tels quels à orjson, qui
+encode directement dates et listes, sans modèle ni validation. `response_model`
+ne sert plus qu'à la documentation OpenAPI.
+
+Les charges construites en Python (statistiques) passent par `to_jsonable`.
+"""
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas.post import ListingStats
+
+LISTING_STATS = TypeAdapter(ListingStats)
+
+
+def to_jsonable(adapter: TypeAdapter, data: Any) -> Any:
+    """Valide `data` et renvoie des types JSON natifs (cachables tels quels)."""
+    return adapter.dump_python(adapter.validate_python(data), mode="json")
+
+
+def json_response(payload: Any, **kwargs) -> ORJSONResponse:
+    return ORJSONResponse(payload, **kwargs)
@@ -0,0 +1,108 @@
+"""
+Statistiques d'annonces par propriétaire et par agence, tenues à jour par $inc.
+
+Un document par périmètre dans `listing_stats` (_id "owner:<id>" ou
+"agency:<agence>") : total, somme des prix et ventilation par statut. Les
+endpoints de tableau de bord lisent un seul document ; scripts.reconcile_stats
+reconstruit les compteurs depuis `properties` et mesure la dérive.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app import mongo_connect
+
+STATS_COLLECTION = "listing_stats"
+STATUSES = ("en cours", "vendu", "loué", "retiré")
+OTHER_STATUS = "autre"
+
+# (statut, prix) d'une annonce ; None = annonce inexistante (création / suppression)
+Listing = Tuple[str, float]
+
+
+def status_key(status: Optional[str]) -> str:
+    # Statuts libres (import, création) regroupés : pas de clé arbitraire dans les chemins $inc
+    return status if status in STATUSES else OTHER_STATUS
+
+
+def owner_stats_id(owner_id) -> str:
+    return f"owner:{owner_id}"
+
+
+def agency_stats_id(agence: str) -> str:
+    return f"agency:{agence}"
+
+
+def listing_increments(changes: Iterable[Tuple[Optional[Listing], Optional[Listing]]]) -> Dict[str, float]:
+    """Cumule les deltas (avant -> après) en un seul document $inc."""
+    inc = defaultdict(int)
+    for before, after in changes:
+        for listing, sign in ((before, -1), (after, 1)):
+            if listing is None:
+                continue
+            status, price = listing
+            key = status_key(status)
+            inc["total"] += sign
+            inc["price_sum"] += sign * (price or 0)
+            inc[f"by_status.{key}.count"] += sign
+            inc[f"by_status.{key}.price_sum"] += sign * (price or 0)
+    return {field: value for field, value in inc.items() if value}
+
+
+async def record_listing_changes(owner, changes: Iterable[Tuple[Optional[Listing], Optional[Listing]]]) -> None:
+    """
+    Applique les deltas aux compteurs du propriétaire et de son agence en un
+    seul aller-retour. Chaque document est mis à jour atomiquement ; un écart
+    avec `properties` (écriture interrompue entre les deux) est corrigé par la
+    réconciliation.
+    """
+    inc = listing_increments(changes)
+    if owner is None or not inc:
+        return
+    now = datetime.utcnow()
+    scopes = [(owner_stats_id(owner.id), "owner", str(owner.id))]
+    if owner.agence:
+        scopes.append((agency_stats_id(owner.agence), "agency", owner.agence))
+    await mongo_connect.db[STATS_COLLECTION].bulk_write([
+        UpdateOne(
+            {"_id": stats_id},
+            {"$inc": inc, "$set": {"scope": scope, "key": key, "updated_at": now}},
+            upsert=True,
+        )
+        for stats_id, scope, key in scopes
+    ], ordered=False)
+
+
+async def get_stats(stats_id: str) -> Optional[dict]:
+    return await mongo_connect.db[STATS_COLLECTION].find_one({"_id": stats_id})
+
+
+def _average(price_sum: float, count: int) -> Optional[float]:
+    return round(price_sum / count, 2) if count else None
+
+
+def stats_payload(doc: Optional[dict], scope: str, key: str) -> dict:
+    """Forme de ListingStats (moyennes calculées à la lecture) ; compteurs à zéro si absent."""
+    doc = doc or {}
+    by_status = {}
+    for status in (*STATUSES, OTHER_STATUS):
+        values = (doc.get("by_status") or {}).get(status, {})
+        count = int(values.get("count", 0))
+        if count or status != OTHER_STATUS:
+            by_status[status] = {
+                "count": count,
+                "price_sum": values.get("price_sum", 0.0),
+                "average_price": _average(values.get("price_sum", 0.0), count),
+            }
+    total = int(doc.get("total", 0))
+    return {
+        "scope": scope,
+        "key": key,
+        "total": total,
+        "price_sum": doc.get("price_sum", 0.0),
+        "average_price": _average(doc.get("price_sum", 0.0), total),
+        "by_status": by_status,
+        "updated_at": doc.get("updated_at"),
+    }
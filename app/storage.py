@@ -0,0 +1,134 @@
+import asyncio
+import functools
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from bson import ObjectId
+from gridfs.errors import NoFile
+
+from app.config import settings
+from app.metrics import time_external
+from app.mongo_connect import get_gridfs_bucket
+
+# Appels bloquants (SDK Cloudinary, disque) hors de la boucle d'événements, plafonnés par processus
+_upload_executor = ThreadPoolExecutor(max_workers=settings.upload_max_workers, thread_name_prefix="upload")
+_upload_semaphore = asyncio.Semaphore(settings.upload_max_concurrency)
+
+
+async def run_blocking(func, *args, **kwargs):
+    async with _upload_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_upload_executor, functools.partial(func, *args, **kwargs))
+
+
+class StorageBackend:
+    """Interface des backends de stockage des médias ; `save` renvoie l'URL publique."""
+
+    async def save(self, data: bytes, filename: str, content_type: str) -> str:
+        raise NotImplementedError
+
+    async def delete(self, url: str) -> None:
+        """Supprime le fichier d'une URL renvoyée par `save` (sans erreur s'il n'existe plus)."""
+        raise NotImplementedError
+
+
+class LocalStorage(StorageBackend):
+    """Fichiers écrits sous `directory` et servis par le montage statique /uploads."""
+
+    def __init__(self, directory: str = "uploads/images", base_url: str = "/uploads/images"):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(directory, exist_ok=True)
+
+    def _write(self, path: str, data: bytes) -> None:
+        with open(path, "wb") as f:
+            f.write(data)
+
+    async def save(self, data: bytes, filename: str, content_type: str) -> str:
+        name = f"{uuid.uuid4()}{os.path.splitext(filename)[1]}"
+        await run_blocking(self._write, os.path.join(self.directory, name), data)
+        return f"{self.base_url}/{name}"
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def delete(self, url: str) -> None:
+        await run_blocking(self._remove, os.path.join(self.directory, os.path.basename(url)))
+
+
+class GridFSStorage(StorageBackend):
+    """Fichiers stockés dans GridFS et servis par /media/{file_id}."""
+
+    def __init__(self, base_url: str = "/media"):
+        self.base_url = base_url.rstrip("/")
+
+    async def save(self, data: bytes, filename: str, content_type: str) -> str:
+        file_id = await get_gridfs_bucket().upload_from_stream(
+            filename,
+            data,
+            chunk_size_bytes=settings.chunk_size,
+            metadata={"contentType": content_type},
+        )
+        return f"{self.base_url}/{file_id}"
+
+    async def delete(self, url: str) -> None:
+        try:
+            await get_gridfs_bucket().delete(ObjectId(url.rsplit("/", 1)[-1]))
+        except NoFile:
+            pass
+
+
+class CloudinaryStorage(StorageBackend):
+    def __init__(self, folder: str = "immobilier"):
+        # SDK importé et configuré au premier upload, pas au démarrage
+        import cloudinary
+        import cloudinary.uploader
+
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+            secure=True,
+        )
+        self.uploader = cloudinary.uploader
+        self.folder = folder
+
+    async def save(self, data: bytes, filename: str, content_type: str) -> str:
+        with time_external("cloudinary", "upload"):
+            result = await run_blocking(self.uploader.upload, BytesIO(data), folder=self.folder)
+        return result["secure_url"]
+
+    @staticmethod
+    def public_id(url: str) -> str:
+        # .../image/upload/v1712345678/immobilier/photo_abc.webp -> immobilier/photo_abc
+        path = url.split("/upload/", 1)[-1]
+        parts = path.split("/")
+        if parts[0].startswith("v") and parts[0][1:].isdigit():
+            parts = parts[1:]
+        return os.path.splitext("/".join(parts))[0]
+
+    async def delete(self, url: str) -> None:
+        with time_external("cloudinary", "destroy"):
+            await run_blocking(self.uploader.destroy, self.public_id(url))
+
+
+_storage: StorageBackend = None
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        if settings.storage_backend == "local":
+            _storage = LocalStorage(settings.local_storage_dir)
+        elif settings.storage_backend == "gridfs":
+            _storage = GridFSStorage()
+        elif settings.storage_backend == "cloudinary":
+            _storage = CloudinaryStorage()
+        else:
+            raise RuntimeError(f"storage_backend inconnu : {settings.storage_backend}")
+    return _storage
@@ -1,14 +1,28 @@
 from passlib.context import CryptContext
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from app.config import settings
+from app.email_queue import email_queue
 from app.models.user import User
-import httpx
 from dotenv import load_dotenv
 load_dotenv()
 
-SENDINBLUE_API_KEY = os.getenv("SENDINBLUE_API_KEY")
+# min/max = default : tout hash dont le coût diffère de la config est marqué à re-hasher
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt libère le GIL : un pool de threads dédié suffit à décharger la boucle
+_hash_executor = ThreadPoolExecutor(max_workers=settings.hash_max_workers, thread_name_prefix="bcrypt")
+_hash_pending = 0
 
 
 def hashed(password: str):
@@ -19,6 +33,32 @@ def verify(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_hash_job(func, *args):
+    """Exécute un calcul bcrypt dans le pool ; refuse immédiatement au-delà de la file max."""
+    global _hash_pending
+    if _hash_pending >= settings.hash_max_queue:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run_hash_job(pwd_context.hash, password)
+
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(valide, nouveau_hash) ; nouveau_hash est fourni si le coût configuré a changé."""
+    return await _run_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def get_filename(filename: str) -> str:
     base, ext = os.path.splitext(filename)
 
@@ -37,8 +77,10 @@ def authenticate_user(username: str, password: str):
     return user 
 
 
-async def send_user_request_email(name: str, email: str, agence: str, contact: str):
-    url = "https://api.brevo.com/v3/smtp/email"
+def send_user_request_email(name: str, email: str, agence: str, contact: str) -> str:
+    """
+    Met en file l'email de demande de compte destiné à l'admin et renvoie l'id du job
+    """
     subject = "📩 Nouvelle demande de compte utilisateur Sunu-Villa"
     html_content = f"""
     <div>
@@ -55,22 +97,13 @@ async def send_user_request_email(name: str, email: str, agence: str, contact: s
         "subject": subject,
         "htmlContent": html_content
     }
-    headers = {
-        "api-key": SENDINBLUE_API_KEY,
-        "Content-Type": "application/json"
-    }
+    return email_queue.enqueue(data)
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, json=data, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
 
-
-async def send_account_created_email(client_email: str, client_name: str, password: str):
+def send_account_created_email(client_email: str, client_name: str, password: str) -> str:
     """
-    Envoie un email au client avec une mise en page améliorée
+    Met en file l'email au client avec une mise en page améliorée et renvoie l'id du job
     """
-    url = "https://api.brevo.com/v3/smtp/email"
     subject = "✅ Votre compte sur Sunu-Villa est prêt !"
 
     html_content = f"""
@@ -106,12 +139,4 @@ async def send_account_created_email(client_email: str, client_name: str, passwo
         "subject": subject,
         "htmlContent": html_content
     }
-    headers = {
-        "api-key": SENDINBLUE_API_KEY,
-        "Content-Type": "application/json"
-    }
-
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, json=data, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+    return email_queue.enqueue(data)
@@ -0,0 +1,82 @@
+"""
+Débit de l'import par lots et de l'export en flux (par défaut 100 000 documents).
+
+    MONGO_URL=mongodb://localhost:27017/immobilier_bench python -m benchmarks.bulk_export_import [--count N]
+
+Utilise la base de MONGO_URL (prévoir une base dédiée) ; les documents créés
+sont marqués et supprimés à la fin. La mémoire Python maximale est mesurée
+avec tracemalloc pour vérifier que l'export reste à mémoire constante.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+
+for name in ("SECRET_KEY", "SENDINBLUE_API_KEY"):
+    os.environ.setdefault(name, "benchmark")
+
+MARKER = "__bench_bulk__"
+
+
+def make_lines(count: int):
+    for i in range(count):
+        yield json.dumps({
+            "title": f"Villa {i}",
+            "price": 1_000_000 + i,
+            "type": ("villa", "appartement", "terrain")[i % 3],
+            "localisation": ("Almadies", "Ngor", "Mermoz", "Plateau")[i % 4],
+            "adresse_complet": f"{i} rue des Almadies, Dakar",
+            "description": "Belle propriété avec piscine et jardin. " * 4,
+            "surface": 80 + i % 400,
+            "chambres": 1 + i % 6,
+            "salle_de_bain": 1 + i % 3,
+            "equipement": [MARKER, "piscine"],
+            "images": [f"https://example.invalid/{i}.webp"],
+        })
+
+
+async def run(count: int, batch_size: int):
+    from app import mongo_connect
+    from app.bulk import import_rows, iter_export_csv, iter_export_ndjson, parse_ndjson_line
+
+    await mongo_connect.connect_database()
+    collection = mongo_connect.db["properties"]
+    query = {"equipement": MARKER}
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        report = await import_rows(make_lines(count), parse_ndjson_line, None, batch_size)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"import  : {report.inserted} docs en {elapsed:.2f} s "
+              f"({report.inserted / elapsed:,.0f} docs/s, pic {peak / 1e6:.1f} Mo, {len(report.errors)} erreurs)")
+
+        for label, exporter in (("ndjson", iter_export_ndjson), ("csv", iter_export_csv)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = 0
+            async for chunk in exporter(collection, query, batch_size):
+                size += len(chunk)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"export {label:6}: {count} docs en {elapsed:.2f} s "
+                  f"({count / elapsed:,.0f} docs/s, {size / 1e6:.1f} Mo, pic {peak / 1e6:.1f} Mo)")
+    finally:
+        await collection.delete_many(query)
+        await mongo_connect.disconnect_from_database()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Débit du pipeline de traitement d'images (app.images.process_image).
+
+    python -m benchmarks.image_pipeline [--workers N] [--rounds R] [dossier]
+
+Traite chaque image du dossier (uploads/images par défaut) R fois dans un
+ProcessPoolExecutor de N processus et affiche images/s et images/s par cœur.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from app.images import process_image
+
+EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="uploads/images")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    files = [p for p in sorted(Path(args.directory).iterdir()) if p.suffix.lower() in EXTENSIONS]
+    payloads = [p.read_bytes() for p in files] * args.rounds
+    if not payloads:
+        raise SystemExit(f"Aucune image dans {args.directory}")
+
+    input_bytes = sum(len(p) for p in payloads)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # Échauffement : démarrage des processus et import de Pillow
+        list(pool.map(process_image, payloads[:args.workers]))
+
+        start = time.perf_counter()
+        results = list(pool.map(process_image, payloads))
+        elapsed = time.perf_counter() - start
+
+    output_bytes = sum(len(b) for r in results for b in r.values())
+    throughput = len(payloads) / elapsed
+    print(f"images         : {len(payloads)} ({len(files)} fichiers x {args.rounds})")
+    print(f"workers        : {args.workers}")
+    print(f"durée          : {elapsed:.2f} s")
+    print(f"débit          : {throughput:.2f} images/s")
+    print(f"débit par cœur : {throughput / args.workers:.2f} images/s")
+    print(f"octets         : {input_bytes / 1e6:.1f} Mo -> {output_bytes / 1e6:.1f} Mo (toutes variantes)")
+
+
+if __name__ == "__main__":
+    main()
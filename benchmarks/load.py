@@ -0,0 +1,410 @@
+"""
+Charge et latence des routers contre un mongod local, avec stockage et emails bouchonnés.
+
+    MONGO_URL=mongodb://localhost:27017/immobilier_bench \
+        python -m benchmarks.load [--mix mixed] [--users 200] [--properties 20000] \
+        [--requests 5000] [--concurrency 32] [--seed 42] [--output run.json]
+
+L'application FastAPI est pilotée en processus via httpx.ASGITransport (lifespan
+compris) : les latences couvrent routers, sérialisation et Mongo, sans le réseau
+ni uvicorn. La base de MONGO_URL doit contenir « bench » dans son nom ; ses
+collections sont supprimées en fin de run (sauf --keep).
+
+Sortie JSON (stdout ou --output) : métadonnées du run (commit, paramètres) puis,
+par endpoint, nombre de requêtes, erreurs, p50/p95/p99, débit et mémoire allouée
+par requête (pic tracemalloc, phase séquentielle séparée). Comparer deux commits :
+même --seed, mêmes volumes, même machine.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+
+for name, value in (
+    ("SECRET_KEY", "benchmark"),
+    ("SENDINBLUE_API_KEY", "benchmark"),
+    ("MONGO_URL", "mongodb://localhost:27017/immobilier_bench"),
+    ("EMAIL_TRANSPORT", "stub"),
+):
+    os.environ.setdefault(name, value)
+
+PASSWORD = "benchmark-password"
+TYPES = ("villa", "appartement", "terrain", "studio", "bureau")
+LOCALISATIONS = ("Almadies", "Ngor", "Mermoz", "Plateau", "Ouakam", "Yoff", "Sacré-Cœur", "Point E")
+AGENCES = ("Sunu Immo", "Teranga Habitat", "Dakar Homes", "Keur Immo")
+SORTS = ("created_at", "price", "surface")
+# Collections vidées avant la mesure et supprimées après
+COLLECTIONS = (
+    "users", "properties", "property_tombstones", "collection_versions", "media_assets", "listing_stats",
+)
+
+# Poids relatifs des opérations par profil de trafic
+MIXES = {
+    "browse": {"public_all": 55, "detail": 35, "search": 10},
+    "mixed": {"public_all": 40, "detail": 30, "search": 5, "my_properties": 10, "login": 10, "create": 5},
+    "login": {"login": 100},
+    "create": {"create": 100},
+}
+
+
+class StubStorage:
+    """Remplace Cloudinary : aucune I/O, une URL factice par fichier."""
+
+    def __init__(self):
+        self.saved = 0
+
+    async def save(self, data: bytes, filename: str, content_type: str) -> str:
+        self.saved += 1
+        return f"https://stub.invalid/{self.saved}/{filename}"
+
+
+def make_image(width: int = 1600, height: int = 1200) -> bytes:
+    from PIL import Image
+
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+async def seed(db, users: int, properties: int, rng: random.Random) -> dict:
+    from bson import DBRef, ObjectId
+
+    from app.oauth2 import create_access_token
+    from app.utils import pwd_context
+
+    password_hash = pwd_context.hash(PASSWORD)
+    now = datetime.utcnow()
+    user_docs = [{
+        "_id": ObjectId(),
+        "name": f"Agent {i}",
+        "email": f"bench{i}@example.com",
+        "password": password_hash,
+        "agence": AGENCES[i % len(AGENCES)],
+        "contact": f"77{i:07d}",
+        "created_at": now - timedelta(days=i),
+    } for i in range(users)]
+    await db["users"].insert_many(user_docs)
+
+    property_ids = []
+    batch = []
+    for i in range(properties):
+        owner = user_docs[rng.randrange(users)]
+        created_at = now - timedelta(minutes=i)
+        doc = {
+            "_id": ObjectId(),
+            "title": f"{rng.choice(TYPES).capitalize()} {i} à {rng.choice(LOCALISATIONS)}",
+            "price": float(rng.randrange(10, 900) * 1_000_000),
+            "type": rng.choice(TYPES),
+            "localisation": rng.choice(LOCALISATIONS),
+            "adresse_complet": f"{i} rue {rng.choice(LOCALISATIONS)}, Dakar",
+            "description": "Belle propriété lumineuse avec jardin, proche commerces et plage. " * 3,
+            "surface": float(rng.randrange(30, 800)),
+            "chambres": rng.randrange(1, 7),
+            "salle_de_bain": rng.randrange(1, 4),
+            "equipement": rng.sample(["piscine", "jardin", "climatisation", "garage", "gardien"], 2),
+            "images": [f"https://stub.invalid/seed/{i}_{n}.webp" for n in range(4)],
+            "location": {
+                "type": "Point",
+                "coordinates": [-17.5 + rng.random() * 0.2, 14.65 + rng.random() * 0.15],
+            },
+            "owner": DBRef("users", owner["_id"]),
+            "owner_snapshot": {
+                "name": owner["name"], "email": owner["email"],
+                "agence": owner["agence"], "contact": owner["contact"],
+            },
+            "status": "en cours" if rng.random() < 0.8 else "vendu",
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        batch.append(doc)
+        property_ids.append(str(doc["_id"]))
+        if len(batch) >= 1000:
+            await db["properties"].insert_many(batch)
+            batch = []
+    if batch:
+        await db["properties"].insert_many(batch)
+
+    return {
+        "emails": [doc["email"] for doc in user_docs],
+        "tokens": [
+            create_access_token({"user_id": str(doc["_id"]), "user_name": doc["name"]})
+            for doc in user_docs
+        ],
+        "property_ids": property_ids,
+    }
+
+
+# ------------------------------
+# Opérations : (client, contexte, rng) -> réponse httpx
+# ------------------------------
+async def op_public_all(client, ctx, rng):
+    params = {"limit": 20, "sort": rng.choice(SORTS)}
+    if rng.random() < 0.5:
+        params["type"] = rng.choice(TYPES)
+    return await client.get("/posts/public/all", params=params)
+
+
+async def op_detail(client, ctx, rng):
+    return await client.get(f"/posts/public/{rng.choice(ctx['property_ids'])}")
+
+
+async def op_search(client, ctx, rng):
+    return await client.get("/posts/search", params={"q": rng.choice(LOCALISATIONS + TYPES)})
+
+
+async def op_my_properties(client, ctx, rng):
+    token = rng.choice(ctx["tokens"])
+    return await client.get("/posts/my-properties", headers={"Authorization": f"Bearer {token}"})
+
+
+async def op_login(client, ctx, rng):
+    return await client.post("/auth/login", data={"username": rng.choice(ctx["emails"]), "password": PASSWORD})
+
+
+async def op_create(client, ctx, rng):
+    token = rng.choice(ctx["tokens"])
+    # Octets distincts par fichier (Pillow ignore ce qui suit la fin du JPEG) : sans quoi
+    # la déduplication par empreinte éviterait le traitement dès la deuxième création
+    files = [
+        ("images", (f"photo{n}.jpg", ctx["image"] + rng.randbytes(16), "image/jpeg")) for n in range(2)
+    ]
+    data = {
+        "title": "Villa de test",
+        "price": str(rng.randrange(10, 900) * 1_000_000),
+        "type": rng.choice(TYPES),
+        "localisation": rng.choice(LOCALISATIONS),
+        "adresse_complet": "1 route de la Corniche, Dakar",
+        "description": "Propriété créée par le benchmark.",
+        "surface": "120",
+        "chambres": "3",
+        "salle_de_bain": "2",
+        "equipement": json.dumps(["piscine"]),
+        "latitude": "14.7",
+        "longitude": "-17.45",
+    }
+    return await client.post(
+        "/posts/create", data=data, files=files, headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+OPERATIONS = {
+    "public_all": op_public_all,
+    "detail": op_detail,
+    "search": op_search,
+    "my_properties": op_my_properties,
+    "login": op_login,
+    "create": op_create,
+}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Rang le plus proche ; `sorted_values` non vide et trié."""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_load(client, ctx, mix: dict, total: int, concurrency: int, seed: int, record: bool = True):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    sizes = defaultdict(int)
+    per_worker = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+    async def worker(index: int):
+        # Un générateur par worker : séquence d'opérations reproductible
+        rng = random.Random(seed * 1000 + index)
+        for _ in range(per_worker[index]):
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                resp = await OPERATIONS[name](client, ctx, rng)
+                failed = resp.status_code >= 400
+                size = len(resp.content)
+            except Exception:
+                failed, size = True, 0
+            elapsed = time.perf_counter() - start
+            if record:
+                latencies[name].append(elapsed)
+                sizes[name] += size
+                if failed:
+                    errors[name] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - start
+    return latencies, errors, sizes, wall
+
+
+async def measure_memory(client, ctx, names, samples: int, seed: int) -> dict:
+    """Pic d'allocation Python par requête, endpoints exécutés un par un."""
+    rng = random.Random(seed)
+    result = {}
+    tracemalloc.start()
+    try:
+        for name in names:
+            peaks = []
+            for _ in range(samples):
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                await OPERATIONS[name](client, ctx, rng)
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            result[name] = statistics.median(peaks)
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def summarize(latencies, errors, sizes, wall, memory) -> dict:
+    endpoints = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "throughput_rps": round(len(values) / wall, 2),
+            "latency_ms": {
+                "p50": round(percentile(values, 50) * 1000, 3),
+                "p95": round(percentile(values, 95) * 1000, 3),
+                "p99": round(percentile(values, 99) * 1000, 3),
+                "mean": round(statistics.fmean(values) * 1000, 3),
+                "max": round(values[-1] * 1000, 3),
+            },
+            "mean_response_bytes": round(sizes[name] / len(values)),
+            "alloc_peak_kib": round(memory[name] / 1024, 1) if name in memory else None,
+        }
+    return endpoints
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    from app import mongo_connect, storage
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    storage._storage = StubStorage()
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        db = mongo_connect.db
+        if "bench" not in db.name and not args.force:
+            raise SystemExit(f"Base « {db.name} » refusée : utiliser une base dédiée (nom contenant « bench ») ou --force")
+        for name in COLLECTIONS:
+            await db[name].delete_many({})
+
+        start = time.perf_counter()
+        ctx = await seed(db, args.users, args.properties, rng)
+        seed_seconds = time.perf_counter() - start
+        ctx["image"] = make_image()
+        mix = MIXES[args.mix]
+
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                if args.warmup:
+                    await run_load(client, ctx, mix, args.warmup, args.concurrency, args.seed + 1, record=False)
+                latencies, errors, sizes, wall = await run_load(
+                    client, ctx, mix, args.requests, args.concurrency, args.seed,
+                )
+                memory = {}
+                if args.memory_samples:
+                    memory = await measure_memory(client, ctx, sorted(mix), args.memory_samples, args.seed)
+        finally:
+            if not args.keep:
+                for name in COLLECTIONS:
+                    await db[name].drop()
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": vars(args),
+            "seed_seconds": round(seed_seconds, 2),
+            "wall_seconds": round(wall, 3),
+            "total_requests": total,
+            "total_throughput_rps": round(total / wall, 2),
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "endpoints": summarize(latencies, errors, sizes, wall, memory),
+    }
+
+
+def print_table(report: dict) -> None:
+    print(f"{'endpoint':<14} {'req':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'alloc KiB':>10}",
+          file=sys.stderr)
+    for name, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(f"{name:<14} {stats['requests']:>6} {stats['errors']:>4} {stats['throughput_rps']:>8.1f} "
+              f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} "
+              f"{stats['alloc_peak_kib'] if stats['alloc_peak_kib'] is not None else '-':>10}",
+              file=sys.stderr)
+
+
+def print_comparison(report: dict, baseline: dict) -> None:
+    """Écart relatif des p50/p95 par rapport à un run de référence (même format JSON)."""
+    print(f"\n{'endpoint':<14} {'p50 ref':>9} {'p50':>9} {'Δ':>7} {'p95 ref':>9} {'p95':>9} {'Δ':>7}", file=sys.stderr)
+    for name, stats in report["endpoints"].items():
+        ref = baseline.get("endpoints", {}).get(name)
+        if ref is None:
+            continue
+        row = f"{name:<14}"
+        for pct in ("p50", "p95"):
+            before, after = ref["latency_ms"][pct], stats["latency_ms"][pct]
+            delta = (after - before) / before * 100 if before else 0.0
+            row += f" {before:>9.1f} {after:>9.1f} {delta:>+6.1f}%"
+        print(row, file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--properties", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--memory-samples", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="fichier JSON (défaut : stdout)")
+    parser.add_argument("--keep", action="store_true", help="conserver les données semées")
+    parser.add_argument("--force", action="store_true", help="accepter une base sans « bench » dans son nom")
+    parser.add_argument("--compare", help="rapport JSON d'un run précédent à comparer")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_table(report)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(report, json.load(f))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
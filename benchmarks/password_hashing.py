@@ -0,0 +1,55 @@
+"""
+Débit de vérification bcrypt via le pool dédié de app.utils (≈ débit de /auth/login).
+
+    python -m benchmarks.password_hashing [--requests N] [--rounds COST]
+
+Les variables d'environnement minimales de Settings reçoivent des valeurs
+factices si elles sont absentes : aucune connexion n'est ouverte.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+for name in ("MONGO_URL", "SECRET_KEY", "SENDINBLUE_API_KEY"):
+    os.environ.setdefault(name, "benchmark")
+
+
+async def run(requests: int):
+    from app import utils
+    from app.config import settings
+
+    password = "correct horse battery staple"
+    stored = await utils.hash_password(password)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(utils.verify_and_update(password, stored) for _ in range(requests)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in results if not isinstance(r, Exception) and r[0])
+    rejected = sum(1 for r in results if isinstance(r, Exception))
+    throughput = ok / elapsed
+    workers = settings.hash_max_workers
+    print(f"coût bcrypt    : {settings.bcrypt_rounds}")
+    print(f"workers        : {workers} (file max {settings.hash_max_queue})")
+    print(f"vérifications  : {ok} ok, {rejected} refusées (surcharge)")
+    print(f"durée          : {elapsed:.2f} s")
+    print(f"débit          : {throughput:.1f} logins/s")
+    print(f"débit par cœur : {throughput / min(workers, os.cpu_count() or 1):.1f} logins/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=None)
+    args = parser.parse_args()
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
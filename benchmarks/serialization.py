@@ -0,0 +1,100 @@
+"""
+Compare les chemins de sérialisation des listes de propriétés.
+
+    python -m benchmarks.serialization [--sizes 1000 10000] [--repeat 5]
+
+Ancien chemin : un modèle par document recopié champ par champ, revalidation
+par `response_model` (TypeAdapter en mode JSON, comme FastAPI) puis json.dumps.
+Validation : validation en bloc par TypeAdapter prébâti, dump JSON puis orjson.
+Actuel : documents projetés encodés directement par orjson (ORJSONResponse).
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.schemas.post import PropertyOutWithOwner, PropertyPage
+
+PROPERTY_PAGE = TypeAdapter(PropertyPage)
+
+
+def make_docs(count: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [{
+        "id": f"{i:024x}",
+        "title": f"Villa {i} avec piscine",
+        "price": float(150_000_000 + i),
+        "type": "villa",
+        "localisation": "Almadies",
+        "adresse_complet": f"{i} route des Almadies, Dakar",
+        "description": "Belle villa avec piscine, jardin et vue sur mer. " * 5,
+        "surface": 350.0,
+        "chambres": 5,
+        "salle_de_bain": 3,
+        "equipement": ["piscine", "jardin", "climatisation"],
+        "images": [f"https://res.cloudinary.com/demo/image/upload/{i}_{n}.jpg" for n in range(6)],
+        "image_variants": [],
+        "location": None,
+        "status": "en cours",
+        "created_at": now - timedelta(minutes=i),
+        "updated_at": None,
+        "owner": {"name": "Agent", "email": "agent@example.com", "agence": "Sunu", "contact": "770000000"},
+    } for i in range(count)]
+
+
+def old_path(docs: List[dict]) -> bytes:
+    items = [PropertyOutWithOwner(
+        id=d["id"], title=d["title"], price=d["price"], type=d["type"],
+        localisation=d["localisation"], adresse_complet=d["adresse_complet"],
+        description=d["description"], surface=d["surface"], chambres=d["chambres"],
+        salle_de_bain=d["salle_de_bain"], equipement=d["equipement"], images=d["images"],
+        status=d["status"], owner=d["owner"], created_at=d["created_at"],
+    ) for d in docs]
+    response_field = TypeAdapter(List[PropertyOutWithOwner])
+    content = response_field.dump_python(response_field.validate_python(items), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def validated_path(docs: List[dict]) -> bytes:
+    page = {"items": docs, "next_cursor": None}
+    return orjson.dumps(PROPERTY_PAGE.dump_python(PROPERTY_PAGE.validate_python(page), mode="json"))
+
+
+def new_path(docs: List[dict]) -> bytes:
+    return orjson.dumps({"items": docs, "next_cursor": None})
+
+
+def timed(func, docs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(docs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Même corps JSON pour les trois chemins : la comparaison porte sur le coût seul
+    sample = make_docs(3)
+    assert orjson.loads(validated_path(sample)) == orjson.loads(new_path(sample))
+
+    print(f"{'items':>8} {'ancien (ms)':>12} {'validation (ms)':>16} {'actuel (ms)':>12} {'gain':>7}")
+    for size in args.sizes:
+        docs = make_docs(size)
+        old = timed(old_path, docs, args.repeat)
+        validated = timed(validated_path, docs, args.repeat)
+        new = timed(new_path, docs, args.repeat)
+        print(f"{size:>8} {old * 1000:>12.1f} {validated * 1000:>16.1f} {new * 1000:>12.1f} {old / new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
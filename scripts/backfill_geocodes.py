@@ -0,0 +1,83 @@
+"""
+Renseigne `location` pour les propriétés qui n'en ont pas encore.
+
+    python -m scripts.backfill_geocodes --gazetteer lieux.csv [--batch-size 500] [--dry-run]
+    python -m scripts.backfill_geocodes --nominatim
+
+L'adresse complète est essayée en premier, puis la localisation. Les résultats
+sont mis en cache dans la collection `geocode_cache`.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app import mongo_connect
+from app.geocoding import CachedGeocoder, GazetteerGeocoder, NominatimGeocoder
+from app.models.post import GeoPoint
+
+
+async def backfill(geocoder, batch_size: int, dry_run: bool):
+    properties = mongo_connect.db["properties"]
+    cached = CachedGeocoder(geocoder, mongo_connect.db["geocode_cache"])
+
+    updated = missing = 0
+    operations = []
+    cursor = properties.find(
+        {"location": None},
+        projection={"adresse_complet": 1, "localisation": 1},
+        batch_size=batch_size,
+    )
+    async for doc in cursor:
+        point = None
+        for address in (doc.get("adresse_complet"), doc.get("localisation")):
+            if address:
+                point = await cached.geocode(address)
+                if point:
+                    break
+        if point is None:
+            missing += 1
+            continue
+
+        location = GeoPoint.from_lat_lng(*point).model_dump()
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"location": location, "updated_at": datetime.utcnow()}},
+        ))
+        if len(operations) >= batch_size:
+            if not dry_run:
+                await properties.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        if not dry_run:
+            await properties.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    print(f"géocodées : {updated}{' (dry-run)' if dry_run else ''}")
+    print(f"introuvables : {missing}")
+    print(f"cache : {cached.hits} hits, {cached.misses} appels au géocodeur")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--gazetteer", help="CSV name,latitude,longitude")
+    source.add_argument("--nominatim", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    geocoder = GazetteerGeocoder(args.gazetteer) if args.gazetteer else NominatimGeocoder()
+
+    await mongo_connect.connect_database()
+    try:
+        await backfill(geocoder, args.batch_size, args.dry_run)
+    finally:
+        await mongo_connect.disconnect_from_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""
+Rattache chaque entrée de `image_variants` à son image (champ `image`) sur les
+propriétés enregistrées quand les variantes étaient une liste parallèle à `images`.
+
+    python -m scripts.backfill_image_variants
+
+Les images antérieures au traitement n'ont pas de variantes et précèdent
+toujours les autres : l'entrée i correspond à images[len(images) - len(variantes) + i].
+"""
+import asyncio
+
+from app import mongo_connect
+
+
+async def main():
+    await mongo_connect.connect_database()
+    try:
+        offset = {"$subtract": [{"$size": "$images"}, {"$size": "$image_variants"}]}
+        result = await mongo_connect.db["properties"].update_many(
+            {"image_variants": {"$elemMatch": {"image": {"$exists": False}}}},
+            [{"$set": {
+                "image_variants": {"$map": {
+                    "input": {"$range": [0, {"$size": "$image_variants"}]},
+                    "as": "i",
+                    "in": {"$let": {
+                        "vars": {"variants": {"$arrayElemAt": ["$image_variants", "$$i"]}},
+                        "in": {"$mergeObjects": ["$$variants", {"image": {"$ifNull": [
+                            "$$variants.image",
+                            {"$arrayElemAt": ["$images", {"$add": ["$$i", offset]}]},
+                        ]}}]},
+                    }},
+                }},
+                "updated_at": "$$NOW",
+            }}],
+        )
+        print(f"propriétés mises à jour : {result.modified_count}")
+    finally:
+        await mongo_connect.disconnect_from_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
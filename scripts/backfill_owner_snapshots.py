@@ -0,0 +1,49 @@
+"""
+Renseigne `owner_snapshot` sur les propriétés créées avant son introduction
+(ou le resynchronise pour tous les propriétaires avec --all).
+
+    python -m scripts.backfill_owner_snapshots [--all]
+
+Une update_many par propriétaire, envoyées par lots via bulk_write.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from pymongo import UpdateMany
+
+from app import mongo_connect
+from app.models.post import OwnerSnapshot
+
+BATCH_SIZE = 500
+
+
+async def main(resync_all: bool):
+    await mongo_connect.connect_database()
+    try:
+        db = mongo_connect.db
+        operations = []
+        modified = 0
+        now = datetime.utcnow()
+        async for user in db["users"].find({}, {"name": 1, "email": 1, "agence": 1, "contact": 1}):
+            query = {"owner.$id": user["_id"]}
+            if not resync_all:
+                query["owner_snapshot"] = None
+            snapshot = OwnerSnapshot(
+                name=user["name"], email=user["email"], agence=user["agence"], contact=user["contact"],
+            )
+            operations.append(UpdateMany(query, {"$set": {"owner_snapshot": snapshot.model_dump(), "updated_at": now}}))
+            if len(operations) >= BATCH_SIZE:
+                modified += (await db["properties"].bulk_write(operations, ordered=False)).modified_count
+                operations = []
+        if operations:
+            modified += (await db["properties"].bulk_write(operations, ordered=False)).modified_count
+        print(f"propriétés mises à jour : {modified}")
+    finally:
+        await mongo_connect.disconnect_from_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true", help="resynchroniser aussi les instantanés existants")
+    asyncio.run(main(parser.parse_args().all))
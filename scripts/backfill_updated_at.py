@@ -0,0 +1,24 @@
+"""
+Initialise `updated_at` (= created_at) sur les propriétés créées avant son introduction.
+
+    python -m scripts.backfill_updated_at
+"""
+import asyncio
+
+from app import mongo_connect
+
+
+async def main():
+    await mongo_connect.connect_database()
+    try:
+        result = await mongo_connect.db["properties"].update_many(
+            {"updated_at": {"$exists": False}},
+            [{"$set": {"updated_at": {"$ifNull": ["$created_at", "$$NOW"]}}}],
+        )
+        print(f"propriétés mises à jour : {result.modified_count}")
+    finally:
+        await mongo_connect.disconnect_from_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
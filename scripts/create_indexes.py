@@ -0,0 +1,32 @@
+"""
+Crée les index déclarés dans les modèles Beanie (User, Property, PropertyTombstone, MediaAsset).
+
+    python -m scripts.create_indexes [--drop-unknown]
+
+À lancer à chaque déploiement lorsque LAZY_STARTUP=true : l'application ne
+crée alors plus les index au démarrage. --drop-unknown supprime les index
+qui ne sont plus déclarés dans les modèles.
+"""
+import argparse
+import asyncio
+import time
+
+from app import mongo_connect
+
+
+async def main(drop_unknown: bool):
+    start = time.perf_counter()
+    await mongo_connect.connect_database(skip_indexes=False, allow_index_dropping=drop_unknown)
+    try:
+        for name in ("users", "properties", "property_tombstones", "media_assets"):
+            indexes = await mongo_connect.db[name].index_information()
+            print(f"{name:<20} {len(indexes)} index : {', '.join(sorted(indexes))}")
+        print(f"terminé en {time.perf_counter() - start:.2f} s")
+    finally:
+        await mongo_connect.disconnect_from_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drop-unknown", action="store_true")
+    asyncio.run(main(parser.parse_args().drop_unknown))
@@ -0,0 +1,69 @@
+"""
+Supprime par lots les médias orphelins (refcount à zéro depuis plus de
+MEDIA_GC_GRACE_HOURS heures) du stockage puis de media_assets.
+
+    python -m scripts.gc_media [--batch-size 100] [--dry-run]
+
+Chaque média est d'abord retiré de l'index (suppression conditionnelle) : un
+upload concurrent du même contenu ne peut donc plus le réutiliser pendant que
+ses fichiers sont effacés.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from app import mongo_connect
+from app.config import settings
+from app.models.post import MediaAsset
+from app.storage import get_storage
+
+
+def media_urls(doc: dict) -> list:
+    variants = doc.get("variants") or {}
+    return [doc["url"], *filter(None, [variants.get("thumbnail")]), *(variants.get("widths") or {}).values()]
+
+
+async def main(batch_size: int, dry_run: bool):
+    await mongo_connect.connect_database()
+    try:
+        collection = mongo_connect.db[MediaAsset.Settings.name]
+        storage = get_storage()
+        cutoff = datetime.utcnow() - timedelta(hours=settings.media_gc_grace_hours)
+        orphaned = {"refcount": {"$lte": 0}, "orphaned_at": {"$lte": cutoff}}
+
+        collected = failed = 0
+        while True:
+            docs = await collection.find(orphaned).sort("orphaned_at", 1).limit(batch_size).to_list(None)
+            if not docs:
+                break
+            if dry_run:
+                for doc in docs:
+                    print(f"{doc['_id']} {doc['url']} (orphelin depuis {doc['orphaned_at']:%Y-%m-%d %H:%M})")
+                collected += len(docs)
+                break
+
+            for doc in docs:
+                claimed = await collection.find_one_and_delete({"_id": doc["_id"], **orphaned})
+                if claimed is None:
+                    continue  # référencé à nouveau entre-temps
+                results = await asyncio.gather(
+                    *(storage.delete(url) for url in media_urls(claimed)), return_exceptions=True,
+                )
+                errors = [r for r in results if isinstance(r, Exception)]
+                if errors:
+                    failed += 1
+                    print(f"échec de suppression {claimed['_id']} : {errors[0]} ({', '.join(media_urls(claimed))})")
+                collected += 1
+
+        label = "à supprimer (--dry-run, premier lot)" if dry_run else "supprimés"
+        print(f"médias {label} : {collected}, en échec : {failed}")
+    finally:
+        await mongo_connect.disconnect_from_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.dry_run))
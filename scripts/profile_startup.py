@@ -0,0 +1,100 @@
+"""
+Profil du démarrage à froid : coût d'import par module puis durée du lifespan.
+
+    python -m scripts.profile_startup [--lazy] [--top 25] [--budget-ms 1500] [--skip-init]
+
+Chaque mesure tourne dans un interpréteur neuf (`python -X importtime`), comme
+un conteneur qui démarre. --lazy positionne LAZY_STARTUP=true ; --budget-ms
+fait échouer la commande (code 1) si import + lifespan dépassent le budget,
+pour un contrôle en CI. --skip-init ne mesure que les imports (sans Mongo).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+INIT_SNIPPET = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({"import_ms": (imported - start) * 1000, "lifespan_ms": (ready - imported) * 1000}))
+"""
+
+
+def run_python(args, env) -> subprocess.CompletedProcess:
+    proc = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+    return proc
+
+
+def profile_imports(env) -> list:
+    """[(module, self_us, cumulative_us)] d'après la sortie de -X importtime."""
+    proc = run_python(["-X", "importtime", "-c", "import app.main"], env)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lazy", action="store_true")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float)
+    parser.add_argument("--skip-init", action="store_true")
+    parser.add_argument("--json", action="store_true", help="sortie JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.lazy:
+        env["LAZY_STARTUP"] = "true"
+
+    rows = profile_imports(env)
+    by_package = defaultdict(int)
+    for module, self_us, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+    modules = sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    init = None if args.skip_init else json.loads(run_python(["-c", INIT_SNIPPET], env).stdout.splitlines()[-1])
+    total_ms = (init["import_ms"] + init["lifespan_ms"]) if init else sum(us for _, us, _ in rows) / 1000
+
+    if args.json:
+        print(json.dumps({
+            "lazy": args.lazy,
+            "modules": [{"module": m, "self_ms": s / 1000, "cumulative_ms": c / 1000} for m, s, c in modules],
+            "packages": [{"package": p, "self_ms": us / 1000} for p, us in packages],
+            "init": init,
+            "total_ms": total_ms,
+        }, indent=2))
+    else:
+        print(f"{'module (cumulé)':<50} {'ms':>9}")
+        for module, _, cumulative_us in modules:
+            print(f"{module:<50} {cumulative_us / 1000:>9.1f}")
+        print(f"\n{'paquet (propre)':<50} {'ms':>9}")
+        for package, self_us in packages:
+            print(f"{package:<50} {self_us / 1000:>9.1f}")
+        if init:
+            print(f"\nimport app.main : {init['import_ms']:.1f} ms, lifespan : {init['lifespan_ms']:.1f} ms")
+        print(f"total : {total_ms:.1f} ms" + (f" (budget {args.budget_ms:.0f} ms)" if args.budget_ms else ""))
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Reconstruit `listing_stats` depuis `properties` et rapporte la dérive.
+
+    python -m scripts.reconcile_stats [--dry-run] [--tolerance 0.01]
+
+Les compteurs attendus sont recalculés en un parcours des propriétés
+(projection statut / prix / propriétaire) ; l'agence est celle actuelle du
+propriétaire. Chaque document en écart est listé puis remplacé, sauf avec
+--dry-run. Code de sortie 1 si une dérive a été trouvée.
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+
+from app import mongo_connect
+from app.stats import (
+    STATS_COLLECTION,
+    agency_stats_id,
+    listing_increments,
+    owner_stats_id,
+)
+
+
+def nest(inc: dict) -> dict:
+    """{"by_status.vendu.count": 2} -> {"by_status": {"vendu": {"count": 2}}}"""
+    doc = {}
+    for path, value in inc.items():
+        target = doc
+        *parents, leaf = path.split(".")
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return doc
+
+
+def counters(doc: dict) -> dict:
+    """Compteurs comparables d'un document de stats (à plat, sans métadonnées)."""
+    flat = {"total": doc.get("total", 0), "price_sum": doc.get("price_sum", 0)}
+    for status, values in (doc.get("by_status") or {}).items():
+        for field, value in values.items():
+            flat[f"by_status.{status}.{field}"] = value
+    return {key: value for key, value in flat.items() if value}
+
+
+def differs(expected: dict, actual: dict, tolerance: float) -> bool:
+    for key in set(expected) | set(actual):
+        if abs(expected.get(key, 0) - actual.get(key, 0)) > tolerance:
+            return True
+    return False
+
+
+async def main(dry_run: bool, tolerance: float) -> int:
+    await mongo_connect.connect_database()
+    try:
+        db = mongo_connect.db
+        agencies = {
+            user["_id"]: user.get("agence")
+            async for user in db["users"].find({}, {"agence": 1})
+        }
+
+        changes = defaultdict(list)
+        scopes = {}
+        async for prop in db["properties"].find({}, {"owner": 1, "status": 1, "price": 1}):
+            owner = prop.get("owner")
+            owner_id = getattr(owner, "id", None)
+            if owner_id is None:
+                continue
+            listing = (prop.get("status"), prop.get("price"))
+            changes[owner_stats_id(owner_id)].append((None, listing))
+            scopes[owner_stats_id(owner_id)] = ("owner", str(owner_id))
+            agence = agencies.get(owner_id)
+            if agence:
+                changes[agency_stats_id(agence)].append((None, listing))
+                scopes[agency_stats_id(agence)] = ("agency", agence)
+
+        expected = {stats_id: listing_increments(items) for stats_id, items in changes.items()}
+        actual = {doc["_id"]: doc async for doc in db[STATS_COLLECTION].find({})}
+
+        drifted = 0
+        now = datetime.utcnow()
+        for stats_id in sorted(set(expected) | set(actual)):
+            want = expected.get(stats_id, {})
+            have = counters(actual.get(stats_id, {}))
+            if not differs(want, have, tolerance):
+                continue
+            drifted += 1
+            print(f"{stats_id}: stocké total={have.get('total', 0)} prix={have.get('price_sum', 0):.2f}"
+                  f" -> attendu total={want.get('total', 0)} prix={want.get('price_sum', 0):.2f}")
+            if dry_run:
+                continue
+            if stats_id in expected:
+                scope, key = scopes[stats_id]
+                await db[STATS_COLLECTION].replace_one(
+                    {"_id": stats_id},
+                    {"scope": scope, "key": key, "updated_at": now, **nest(want)},
+                    upsert=True,
+                )
+            else:
+                await db[STATS_COLLECTION].delete_one({"_id": stats_id})
+
+        print(f"{len(expected)} périmètre(s) attendu(s), {len(actual)} stocké(s), {drifted} en dérive"
+              + (" (non corrigés : --dry-run)" if dry_run and drifted else ""))
+        return 1 if drifted else 0
+    finally:
+        await mongo_connect.disconnect_from_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="écart toléré (arrondis sur les sommes de prix)")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.dry_run, args.tolerance)))